@@ -4,5 +4,6 @@ from setuptools import setup
 setup(name="snappy",
       version="0.0.1",
       author="Carlos Martinez",
-      install_requires=['behest', 'pytest', 'requests']
+      install_requires=['behest', 'pytest', 'requests'],
+      extras_require={'async': ['gevent']}
       )
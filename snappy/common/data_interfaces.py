@@ -1,6 +1,8 @@
 import abc
 import json
 import os
+import threading
+from functools import wraps
 from six.moves import configparser
 from six import add_metaclass
 
@@ -60,6 +62,76 @@ def _get_path_from_env(os_env_var):
 CONFIG_KEY = 'CAFE_{section_name}_{key}'
 
 
+class ParsedConfigFile(object):
+    """A config file parsed into a SafeConfigParser, shared by every
+    ConfigParserDataSource reading the same file.  property_values holds
+    the memoised values of config_property properties for each section
+    interface.
+    """
+
+    def __init__(self, config_file_path, mtime, cafe_env_var):
+        self.config_file_path = config_file_path
+        self.mtime = mtime
+        self.cafe_env_var = cafe_env_var
+        self.property_values = {}
+        self.parser = configparser.SafeConfigParser(defaults=cafe_env_var)
+        self.parser.read(config_file_path)
+
+    def is_current(self, mtime, cafe_env_var):
+        return self.mtime == mtime and self.cafe_env_var == cafe_env_var
+
+
+# Parsed config files keyed by absolute path.  A file is parsed again if
+# its mtime changes or if any CAFE_ environment variable changes, since
+# those are both the parser's defaults and the per-key overrides.
+_parsed_config_files = {}
+_parsed_config_files_lock = threading.Lock()
+
+
+def get_parsed_config_file(config_file_path):
+    """Returns the ParsedConfigFile for config_file_path, only reading and
+    parsing the file if it hasn't been parsed yet or has changed since.
+    """
+    config_file_path = os.path.abspath(config_file_path)
+    try:
+        mtime = os.path.getmtime(config_file_path)
+    except OSError:
+        msg = 'Could not verify the existence of config file at {0}'\
+              .format(config_file_path)
+        raise NonExistentConfigPathError(msg)
+
+    cafe_env_var = {key: value for key, value in os.environ.items()
+                    if key.startswith('CAFE_')}
+
+    with _parsed_config_files_lock:
+        parsed = _parsed_config_files.get(config_file_path)
+        if parsed is None or not parsed.is_current(mtime, cafe_env_var):
+            parsed = ParsedConfigFile(config_file_path, mtime, cafe_env_var)
+            _parsed_config_files[config_file_path] = parsed
+        return parsed
+
+
+# This is a decorator
+def config_property(fn):
+    """Like property, but the value is only computed on first access.
+
+    Values are stored with the parsed config file rather than on the
+    instance, so every section interface of the same class reading the
+    same, unchanged file shares them.
+    """
+    name = fn.__name__
+
+    @wraps(fn)
+    def wrapped(self):
+        values = self._property_values
+        try:
+            return values[name]
+        except KeyError:
+            value = values[name] = fn(self)
+            return value
+    return property(wrapped)
+
+
 @add_metaclass(abc.ABCMeta)
 class DataSource(object):
 
@@ -127,25 +199,19 @@ class ConfigParserDataSource(DataSource):
     def __init__(self, config_file_path, section_name):
         super(ConfigParserDataSource, self).__init__()
 
-        cafe_env_var = {key: value for key, value in os.environ.items()
-                        if key.startswith('CAFE_')}
-
-        self._data_source = configparser.SafeConfigParser(
-            defaults=cafe_env_var)
         self._section_name = section_name
 
-        # Check if the path exists
-        if not os.path.exists(config_file_path):
-            msg = 'Could not verify the existence of config file at {0}'\
-                  .format(config_file_path)
-            raise NonExistentConfigPathError(msg)
-
-        # Read the file in and turn it into a SafeConfigParser instance
+        # Read the file in and turn it into a SafeConfigParser instance,
+        # or reuse the one from an earlier read if the file hasn't changed
         try:
-            self._data_source.read(config_file_path)
+            self.parsed_config_file = get_parsed_config_file(
+                config_file_path)
+        except NonExistentConfigPathError:
+            raise
         except Exception as exception:
             self._log.exception(exception)
             raise exception
+        self._data_source = self.parsed_config_file.parser
 
     def get(self, item_name, default=None):
 
@@ -301,6 +367,9 @@ class BaseConfigSectionInterface(object):
         self._data_source = ConfigParserDataSource(
             config_file_path, section_name)
         self._section_name = section_name
+        self._property_values = \
+            self._data_source.parsed_config_file.property_values.setdefault(
+                (self.__class__, section_name), {})
 
     def get(self, item_name, default=None):
         return self._override.get(item_name, None) or \
@@ -1,3 +1,64 @@
+import threading
+
+# Size of the chunks a streamed response is read and parsed in.
+STREAM_CHUNK_SIZE = 65536
+
+_NOT_DESERIALIZED = object()
+
+# Response subclasses with a lazy entity, keyed by the response class
+# they extend.  See _get_lazy_response_class.
+_lazy_response_classes = {}
+_lazy_response_classes_lock = threading.Lock()
+
+
+def _is_streamed(response):
+    """
+    True if the response was requested with stream=True and its body
+    hasn't been read yet.
+    """
+    return not getattr(response, '_content_consumed', True)
+
+
+def _get_deserialize_format(response):
+    content_type = response.headers.get('content-type', '')
+
+    formats = ['text', 'json', 'xml']
+    for format_ in formats:
+        if format_ in content_type:
+            return format_
+    return None
+
+
+class _LazyEntityResponse(object):
+    """
+    Mixed into a response's class so that its entity is only deserialized
+    the first time it's read.
+    """
+    @property
+    def entity(self):
+        entity = self.__dict__.get('_entity', _NOT_DESERIALIZED)
+        if entity is _NOT_DESERIALIZED:
+            entity = self._entity_type.deserialize(
+                self.content, _get_deserialize_format(self))
+            self._entity = entity
+        return entity
+
+    @entity.setter
+    def entity(self, value):
+        self._entity = value
+
+
+def _get_lazy_response_class(response_class):
+    with _lazy_response_classes_lock:
+        lazy_class = _lazy_response_classes.get(response_class)
+        if lazy_class is None:
+            lazy_class = type(
+                'Lazy{0}'.format(response_class.__name__),
+                (_LazyEntityResponse, response_class), {})
+            _lazy_response_classes[response_class] = lazy_class
+        return lazy_class
+
+
 def deserialize(response_entity_type):
     """
     Auto-deserializes the response from any decorated client method call.
@@ -6,29 +67,40 @@ def deserialize(response_entity_type):
 
     response_entity_type must be a Domain Object with a <format>_to_obj()
     classmethod defined for every supported format or this won't work.
+
+    The response is only deserialized the first time response.entity is
+    read, so callers that only check the status or headers don't pay for
+    it.  If the decorated method's instance has deserialize_responses set
+    to False, response.entity is always None and the response is never
+    deserialized.
+
+    If the request was made with requestslib_kwargs={'stream': True}, the
+    body is parsed as it's read, with response_entity_type's
+    deserialize_stream, and never held in memory as a whole.  Streamed
+    responses are always deserialized, straight away, so that their
+    connection is released.  The body can't be read again afterwards, so
+    response.content isn't available.
     """
 
     def decorator(f):
         def wrapper(*args, **kwargs):
             response = f(*args, **kwargs)
-            setattr(response.request, 'entity', None)
-            setattr(response, 'entity', None)
-            deserialize_format = None
-
-            content_type = response.headers.get('content-type', '')
-
-            formats = ['text', 'json', 'xml']
-            for format_ in formats:
-                if format_ in content_type:
-                    deserialize_format = format_
-                    break
 
-            resp_entity = response_entity_type.deserialize(
-                response.content,
-                deserialize_format)
+            if _is_streamed(response):
+                try:
+                    response.entity = response_entity_type.deserialize_stream(
+                        response.iter_content(STREAM_CHUNK_SIZE),
+                        _get_deserialize_format(response))
+                finally:
+                    response.close()
+                return response
 
-            setattr(response, 'entity', resp_entity)
+            if args and not getattr(args[0], 'deserialize_responses', True):
+                response.entity = None
+                return response
 
+            response.__class__ = _get_lazy_response_class(response.__class__)
+            response._entity_type = response_entity_type
             return response
         return wrapper
     return decorator
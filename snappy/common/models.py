@@ -1,3 +1,5 @@
+import itertools
+
 import cclogging
 import six
 
@@ -109,6 +111,41 @@ class AutoMarshallingModel(BaseModel):
                     "deserialization exception")
         return model_object
 
+    @classmethod
+    def deserialize_stream(cls, chunks, format_type):
+        """
+        Like deserialize, but for a body that arrives as an iterator of
+        chunks, e.g. response.iter_content() of a streamed response.
+
+        Models with a _<format>_stream_to_obj classmethod parse the chunks
+        as they arrive.  Other models are given the joined chunks.
+        """
+        cls._log = cclogging.getLogger(
+            cclogging.get_object_namespace(cls))
+
+        # Like deserialize, an empty body deserializes to None.
+        chunks = iter(chunks)
+        for first_chunk in chunks:
+            if first_chunk:
+                chunks = itertools.chain([first_chunk], chunks)
+                break
+        else:
+            return None
+
+        deserialize_method = '_{0}_stream_to_obj'.format(format_type)
+        if not hasattr(cls, deserialize_method):
+            return cls.deserialize(''.join(chunks), format_type)
+
+        model_object = None
+        try:
+            model_object = getattr(cls, deserialize_method)(chunks)
+        except Exception as deserialization_exception:
+            cls._log.exception(deserialization_exception)
+            cls._log.debug(
+                "Deserialization Error: Unable to deserialize a streamed "
+                "body using type: {0}".format(format_type))
+        return model_object
+
     # Serialization Functions
     def _obj_to_json(self):
         raise NotImplementedError
@@ -0,0 +1,393 @@
+"""
+Cooperative counterpart to ObjectStorageAPIClient.
+
+Every network call made through AsyncObjectStorageAPIClient is run as a
+gevent greenlet instead of blocking the caller, which allows thousands of
+in-flight requests from a single process.  Each call returns the greenlet
+running it; greenlet.get() returns the same response the synchronous client
+would have returned (including the deserialized response.entity for
+listings) or raises the exception that was raised by the request.
+
+The socket module has to be patched by gevent for requests to yield while
+waiting on the network, so gevent.monkey.patch_all() must be called before
+anything else is imported, e.g.:
+
+    from gevent import monkey
+    monkey.patch_all()
+
+    client = AsyncObjectStorageAPIClient(storage_url, auth_token,
+                                         max_concurrency=2000)
+    calls = [client.get_object_metadata(container, name)
+             for name in object_names]
+    responses = client.join(calls)
+
+iter_containers and iter_objects are the exception: they return the
+synchronous client's generator, which is consumed by the caller rather
+than run as a greenlet.  Its page requests still yield to other greenlets
+while waiting on the network, but don't count against max_concurrency.
+"""
+from snappy.swift_client import BULK_ARCHIVE_NAME, ObjectStorageAPIClient
+from snappy.tools.streaming import DEFAULT_CHUNK_SIZE
+
+try:
+    import gevent
+    from gevent import monkey
+    from gevent.pool import Pool
+except ImportError:
+    gevent = None
+
+DEFAULT_MAX_CONCURRENCY = 1000
+
+
+class AsyncObjectStorageAPIClient(object):
+    def __init__(self, storage_url, auth_token, base_container_name=None,
+                 base_object_name=None, max_concurrency=None,
+                 pool_connections=None, pool_maxsize=None, keep_alive=True):
+        """
+        @param max_concurrency: the maximum number of requests in flight at
+                                once.  Calls made while the limit is reached
+                                wait for a free slot.
+        @type max_concurrency: int
+
+        All other parameters are passed on to ObjectStorageAPIClient.
+        pool_maxsize defaults to max_concurrency so that every in-flight
+        request can keep its connection alive.
+        """
+        super(AsyncObjectStorageAPIClient, self).__init__()
+
+        if gevent is None:
+            raise ImportError(
+                'gevent is required to use AsyncObjectStorageAPIClient.')
+
+        if not monkey.is_module_patched('socket'):
+            raise RuntimeError(
+                'gevent.monkey.patch_all() must be called before using '
+                'AsyncObjectStorageAPIClient, otherwise requests are run '
+                'one at a time.')
+
+        max_concurrency = max_concurrency or DEFAULT_MAX_CONCURRENCY
+
+        self.client = ObjectStorageAPIClient(
+            storage_url,
+            auth_token,
+            base_container_name=base_container_name,
+            base_object_name=base_object_name,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize or max_concurrency,
+            keep_alive=keep_alive)
+        self.pool = Pool(max_concurrency)
+
+    @property
+    def storage_url(self):
+        return self.client.storage_url
+
+    @property
+    def auth_token(self):
+        return self.client.auth_token
+
+    @property
+    def connection_stats(self):
+        return self.client.connection_stats
+
+    def _spawn(self, func, *args, **kwargs):
+        return self.pool.spawn(func, *args, **kwargs)
+
+    def batch(self, func, items):
+        """
+        Calls func once per item, each as a greenlet.  Unlike the
+        synchronous client's batch, there is no per batch concurrency: the
+        calls share max_concurrency with every other call on this client.
+
+        @param func: client method, or any other function, to call.
+        @type func: function
+        @param items: a tuple of positional arguments for each call.
+        @type items: list of tuples
+
+        @return: one greenlet per item, in input order, see join.
+        @rtype: list of greenlets
+        """
+        return [self._spawn(func, *item) for item in items]
+
+    def join(self, greenlets, raise_error=True):
+        """
+        Waits for all of the greenlets to finish.
+
+        @param greenlets: greenlets returned by calls on this client.
+        @type greenlets: list
+        @param raise_error: if True, the first exception raised by any of
+                            the calls is re-raised.  Otherwise the exception
+                            is returned in place of the response.
+        @type raise_error: bool
+
+        @return: the results of the calls, in the same order as greenlets.
+        @rtype: list
+        """
+        gevent.joinall(greenlets)
+
+        results = []
+        for greenlet in greenlets:
+            if greenlet.successful():
+                results.append(greenlet.value)
+            elif raise_error:
+                raise greenlet.exception
+            else:
+                results.append(greenlet.exception)
+        return results
+
+    def close(self):
+        """
+        Waits for in-flight calls and closes all pooled connections.
+        """
+        self.pool.join()
+        self.client.close()
+
+    def request(
+            self, method, url, headers=None, params=None, data=None,
+            requestslib_kwargs=None):
+        return self._spawn(
+            self.client.request, method, url, headers=headers,
+            params=params, data=data, requestslib_kwargs=requestslib_kwargs)
+
+    def put(self, url, **kwargs):
+        """ HTTP PUT request """
+        return self._spawn(self.client.put, url, **kwargs)
+
+    def copy(self, url, **kwargs):
+        """ HTTP COPY request """
+        return self._spawn(self.client.copy, url, **kwargs)
+
+    def post(self, url, data=None, **kwargs):
+        """ HTTP POST request """
+        return self._spawn(self.client.post, url, data=data, **kwargs)
+
+    def get(self, url, **kwargs):
+        """ HTTP GET request """
+        return self._spawn(self.client.get, url, **kwargs)
+
+    def head(self, url, **kwargs):
+        """ HTTP HEAD request """
+        return self._spawn(self.client.head, url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        """ HTTP DELETE request """
+        return self._spawn(self.client.delete, url, **kwargs)
+
+    def options(self, url, **kwargs):
+        """ HTTP OPTIONS request """
+        return self._spawn(self.client.options, url, **kwargs)
+
+    def get_swift_info(self, headers=None, params=None,
+                       requestslib_kwargs=None):
+        return self._spawn(
+            self.client.get_swift_info, headers=headers, params=params,
+            requestslib_kwargs=requestslib_kwargs)
+
+    def health_check(self, headers=None, params=None,
+                     requestslib_kwargs=None):
+        return self._spawn(
+            self.client.health_check, headers=headers, params=params,
+            requestslib_kwargs=requestslib_kwargs)
+
+    # Account----------------------------------------------------------------
+
+    def get_account_metadata(self):
+        return self._spawn(self.client.get_account_metadata)
+
+    def list_containers(self, headers=None, params=None,
+                        requestslib_kwargs=None):
+        return self._spawn(
+            self.client.list_containers, headers=headers, params=params,
+            requestslib_kwargs=requestslib_kwargs)
+
+    def iter_containers(self, headers=None, params=None, prefetch=True,
+                        requestslib_kwargs=None):
+        """
+        Returns the synchronous client's generator, not a greenlet.  See
+        ObjectStorageAPIClient.iter_containers.
+        """
+        return self.client.iter_containers(
+            headers=headers, params=params, prefetch=prefetch,
+            requestslib_kwargs=requestslib_kwargs)
+
+    # Container--------------------------------------------------------------
+
+    def get_container_metadata(self, container_name, headers=None,
+                               requestslib_kwargs=None):
+        return self._spawn(
+            self.client.get_container_metadata, container_name,
+            headers=headers, requestslib_kwargs=requestslib_kwargs)
+
+    def create_container(self, container_name, headers=None,
+                         requestslib_kwargs=None):
+        return self._spawn(
+            self.client.create_container, container_name, headers=headers,
+            requestslib_kwargs=requestslib_kwargs)
+
+    def delete_container(self, container_name, headers=None,
+                         requestslib_kwargs=None):
+        return self._spawn(
+            self.client.delete_container, container_name, headers=headers,
+            requestslib_kwargs=requestslib_kwargs)
+
+    def set_container_metadata(self, container_name, headers=None,
+                               requestslib_kwargs=None):
+        return self._spawn(
+            self.client.set_container_metadata, container_name,
+            headers=headers, requestslib_kwargs=requestslib_kwargs)
+
+    def get_container_options(self, container_name, headers=None,
+                              requestslib_kwargs=None):
+        return self._spawn(
+            self.client.get_container_options, container_name,
+            headers=headers, requestslib_kwargs=requestslib_kwargs)
+
+    def list_objects(self, container_name, headers=None, params=None,
+                     requestslib_kwargs=None):
+        return self._spawn(
+            self.client.list_objects, container_name, headers=headers,
+            params=params, requestslib_kwargs=requestslib_kwargs)
+
+    def iter_objects(self, container_name, headers=None, params=None,
+                     prefetch=True, requestslib_kwargs=None):
+        """
+        Returns the synchronous client's generator, not a greenlet.  See
+        ObjectStorageAPIClient.iter_objects.
+        """
+        return self.client.iter_objects(
+            container_name, headers=headers, params=params,
+            prefetch=prefetch, requestslib_kwargs=requestslib_kwargs)
+
+    # Storage Object--------------------------------------------------------
+
+    def get_object(self, container_name, object_name, headers=None,
+                   params=None, stream=False,
+                   requestslib_kwargs=None):
+        return self._spawn(
+            self.client.get_object, container_name, object_name,
+            headers=headers, params=params, stream=stream,
+            requestslib_kwargs=requestslib_kwargs)
+
+    def download_object(self, container_name, object_name, sink=None,
+                        headers=None, params=None,
+                        chunk_size=DEFAULT_CHUNK_SIZE,
+                        requestslib_kwargs=None):
+        return self._spawn(
+            self.client.download_object, container_name, object_name,
+            sink=sink, headers=headers, params=params, chunk_size=chunk_size,
+            requestslib_kwargs=requestslib_kwargs)
+
+    def create_object(self, container_name, object_name, data=None,
+                      headers=None, params=None,
+                      requestslib_kwargs=None):
+        return self._spawn(
+            self.client.create_object, container_name, object_name,
+            data=data, headers=headers, params=params,
+            requestslib_kwargs=requestslib_kwargs)
+
+    def create_archive_object(self, data, extract_archive_param,
+                              upload_path='', headers=None,
+                              requestslib_kwargs=None):
+        return self._spawn(
+            self.client.create_archive_object, data, extract_archive_param,
+            upload_path=upload_path, headers=headers,
+            requestslib_kwargs=requestslib_kwargs)
+
+    def copy_object(self, container_name, object_name, headers=None,
+                    requestslib_kwargs=None):
+        return self._spawn(
+            self.client.copy_object, container_name, object_name,
+            headers=headers, requestslib_kwargs=requestslib_kwargs)
+
+    def delete_object(self, container_name, object_name, headers=None,
+                      requestslib_kwargs=None):
+        return self._spawn(
+            self.client.delete_object, container_name, object_name,
+            headers=headers, requestslib_kwargs=requestslib_kwargs)
+
+    def get_object_metadata(self, container_name, object_name, headers=None,
+                            requestslib_kwargs=None):
+        return self._spawn(
+            self.client.get_object_metadata, container_name, object_name,
+            headers=headers, requestslib_kwargs=requestslib_kwargs)
+
+    def set_object_metadata(self, container_name, object_name, headers,
+                            requestslib_kwargs=None):
+        return self._spawn(
+            self.client.set_object_metadata, container_name, object_name,
+            headers, requestslib_kwargs=requestslib_kwargs)
+
+    def set_temp_url_key(self, container_name=None, headers=None,
+                         requestslib_kwargs=None):
+        return self._spawn(
+            self.client.set_temp_url_key, container_name=container_name,
+            headers=headers, requestslib_kwargs=requestslib_kwargs)
+
+    def bulk_delete(self, targets, headers=None, requestslib_kwargs=None):
+        return self._spawn(
+            self.client.bulk_delete, targets, headers=headers,
+            requestslib_kwargs=requestslib_kwargs)
+
+    def batch_create_objects(self, objects, headers=None, params=None):
+        """
+        Creates many storage objects, one greenlet per object.
+
+        @param objects: (container_name, object_name, data) for each object.
+        @type objects: list of tuples
+
+        @return: one greenlet per object, in input order.
+        @rtype: list of greenlets
+        """
+        def create_object(container_name, object_name, data=None):
+            return self.client.create_object(
+                container_name, object_name, data=data,
+                headers=dict(headers or {}), params=params)
+
+        return self.batch(create_object, objects)
+
+    def batch_get_object_metadata(self, container_name, object_names,
+                                  headers=None):
+        """
+        HEADs many objects in a container, one greenlet per object.
+
+        @return: one greenlet per object name, in input order.
+        @rtype: list of greenlets
+        """
+        def get_object_metadata(object_name):
+            return self.client.get_object_metadata(
+                container_name, object_name, headers=dict(headers or {}))
+
+        return self.batch(
+            get_object_metadata,
+            [(object_name,) for object_name in object_names])
+
+    def batch_delete_objects(self, container_name, object_names,
+                             headers=None):
+        """
+        Deletes many objects in a container, one greenlet per object.
+
+        @return: one greenlet per object name, in input order.
+        @rtype: list of greenlets
+        """
+        def delete_object(object_name):
+            return self.client.delete_object(
+                container_name, object_name, headers=dict(headers or {}))
+
+        return self.batch(
+            delete_object,
+            [(object_name,) for object_name in object_names])
+
+    # Local helpers, these make no requests and are not run as greenlets.
+
+    def create_temp_url(self, method, container, obj, seconds, key,
+                        sha_type=None):
+        return self.client.create_temp_url(
+            method, container, obj, seconds, key, sha_type=sha_type)
+
+    def create_archive_stream(self, objects, compression_type=None):
+        return self.client.create_archive_stream(
+            objects, compression_type=compression_type)
+
+    def create_archive(self, object_names, compression_type,
+                       archive_name=BULK_ARCHIVE_NAME):
+        return self.client.create_archive(
+            object_names, compression_type, archive_name=archive_name)
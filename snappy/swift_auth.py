@@ -0,0 +1,161 @@
+import calendar
+import json
+import os
+import threading
+from datetime import datetime
+from time import time
+
+from behest.client import HTTPClient
+
+from snappy.common import cclogging
+from snappy.tools.file_cache import LockedJSONFile
+
+KEYSTONE_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+def authenticate(url, username, api_key):
+    """
+    Requests a token and service catalog from the identity endpoint.
+
+    @return: the 'access' section of the response.
+    @rtype: dictionary
+    """
+    client = HTTPClient()
+    content = {
+        "auth": {
+            "RAX-KSKEY:apiKeyCredentials": {
+                "username": username,
+                "apiKey": api_key
+            }
+        }
+    }
+    body = json.dumps(content)
+    response = client.request(
+        "POST",
+        os.path.join(url, 'v2.0/tokens'),
+        data=body,
+        headers={'Content-type': 'application/json'})
+
+    if not response.ok:
+        raise Exception(
+            'Could not authenticate user "{0}" against {1}: {2}'.format(
+                username, url, response.status_code))
+
+    return response.json()['access']
+
+
+def parse_token_expiry(expires):
+    """
+    Converts a keystone token expiry, e.g. '2014-03-08T04:16:00.000Z', to
+    a unix timestamp.  Returns None if the value can't be parsed.
+    """
+    if not expires:
+        return None
+
+    # Drop the timezone designator and any fractional seconds, keystone
+    # reports expiry times in UTC.
+    expires = expires.rstrip('Z').split('.')[0].split('+')[0]
+    try:
+        parsed = datetime.strptime(expires, KEYSTONE_TIME_FORMAT)
+    except ValueError:
+        return None
+    return calendar.timegm(parsed.timetuple())
+
+
+class AuthTokenCache(object):
+    """
+    Caches auth tokens and service catalogs, keyed by (endpoint, username,
+    region), until shortly before the token expires.
+
+    Tokens are shared by everything in the process and, if a cache file is
+    given, by every process using that file.  The file lock is held while
+    authenticating, so parallel test workers starting together only
+    authenticate once.  Tokens whose expiry can't be parsed aren't cached.
+    """
+    # Shared by all instances so every composite in the process reuses the
+    # same tokens.
+    _tokens = {}
+    _lock = threading.Lock()
+
+    def __init__(self, cache_file_path=None, expiry_margin=300):
+        """
+        @param cache_file_path: file to persist tokens to, readable only by
+                                its owner.  If not provided, tokens are
+                                only cached in memory.
+        @type cache_file_path: string
+        @param expiry_margin: seconds before a token's expiry at which it is
+                              no longer handed out.
+        @type expiry_margin: int
+        """
+        self._log = cclogging.logging.getLogger(
+            cclogging.get_object_namespace(self.__class__))
+        self.cache_file = None
+        if cache_file_path:
+            self.cache_file = LockedJSONFile(cache_file_path)
+        self.expiry_margin = expiry_margin
+
+    @staticmethod
+    def key(endpoint, username, region):
+        return '|'.join([str(endpoint), str(username), str(region)])
+
+    def _is_valid(self, entry):
+        if not entry or entry.get('expires_at') is None:
+            return False
+        return entry['expires_at'] - self.expiry_margin > time()
+
+    def _new_entry(self, key, access):
+        expires = access.get('token', {}).get('expires')
+        expires_at = parse_token_expiry(expires)
+        if expires_at is None:
+            self._log.warning(
+                'Not caching the token for {0}, its expiry {1!r} could not '
+                'be parsed.'.format(key, expires))
+        return {'access': access, 'expires_at': expires_at}
+
+    def get_access(self, key, authenticate_func):
+        """
+        Returns the cached 'access' document for key, calling
+        authenticate_func to get a new one if there is no valid cached
+        entry.
+
+        @param key: cache key, see AuthTokenCache.key
+        @type key: string
+        @param authenticate_func: function taking no arguments and
+                                  returning the 'access' section of an
+                                  auth response.
+        @type authenticate_func: function
+
+        @return: token and service catalog
+        @rtype: dictionary
+        """
+        with self._lock:
+            entry = self._tokens.get(key)
+            if self._is_valid(entry):
+                return entry['access']
+
+            if self.cache_file is None:
+                entry = self._new_entry(key, authenticate_func())
+            else:
+                with self.cache_file.locked():
+                    cached = self.cache_file.read()
+                    entry = cached.get(key)
+                    if not self._is_valid(entry):
+                        entry = self._new_entry(key, authenticate_func())
+                        cached = dict(
+                            (cached_key, cached_entry)
+                            for cached_key, cached_entry in cached.items()
+                            if self._is_valid(cached_entry))
+                        if self._is_valid(entry):
+                            cached[key] = entry
+                        self.cache_file.write(cached)
+
+            self._tokens[key] = entry
+            return entry['access']
+
+    @classmethod
+    def clear(cls):
+        """
+        Forgets all tokens cached in memory.
+        """
+        with cls._lock:
+            cls._tokens.clear()
@@ -1,19 +1,31 @@
 import datetime
-import gzip
 import hmac
 import json
+import threading
 import uuid
+import zlib
 
 from copy import deepcopy
 from hashlib import md5, sha1, sha256
-from random import choice
-from StringIO import StringIO
-from time import sleep, time
+from time import time
 
+from snappy.common import cclogging
 from snappy.tools.unicode_helpers import (UNICODE_BLOCKS, BLOCK_NAMES)
+from snappy.tools.file_cache import LockedJSONFile
 from snappy.tools.md5hash import get_md5_hash
+from snappy.tools.payload import PayloadGenerator
+from snappy.tools.retry import RetryPolicy
+from snappy.tools.streaming import DEFAULT_CHUNK_SIZE, get_body_length
+from snappy.tools.tar_stream import GZIP_WBITS
+from snappy.tools.worker_pool import run_concurrently
+from snappy.swift_client import ObjectStorageListingException
 from snappy.swift_constants import Constants
 
+# Parsed /info documents keyed by swift endpoint, shared by every behaviors
+# instance in the process.
+_swift_info_cache = {}
+_swift_info_lock = threading.Lock()
+
 
 class ObjectStorageAPIBehaviorException(Exception):
     def __init__(self, message, response=None):
@@ -29,20 +41,38 @@ class ObjectStorageAPI_Behaviors(object):
 
     def __init__(self, client=None, config=None):
         super(ObjectStorageAPI_Behaviors, self).__init__()
+        self._log = cclogging.logging.getLogger(
+            cclogging.get_object_namespace(self.__class__))
         self.client = client
         self.config = config
         self.data_pool = [char for char in UNICODE_BLOCKS.get_range(
             BLOCK_NAMES.basic_latin).encoded_codepoints()]
+        self.payload_generator = PayloadGenerator(self.data_pool)
+        self._feature_set = None
+        # Containers this instance has created or seen, so create_object
+        # doesn't have to HEAD the container before every PUT.
+        self._known_containers = set()
+        self._known_containers_lock = threading.Lock()
 
     def retry_until_success(self, func, func_args=None, func_kwargs=None,
                             success_func=None, max_retries=None,
-                            sleep_time=None):
+                            sleep_time=None, deadline=None, policy=None,
+                            call_site=None):
         """
         Allows a function to be re-executed if a success condition is not met.
         The function will be repeatedly executed, with a sleep time between
         retries, until a max retries count is hit. This mechanism ensures that
         eventual consistency does not interfere with test results.
 
+        Retries back off exponentially, starting at retry_initial_sleep_time
+        and going up to sleep_time, so a condition that is met within a
+        fraction of a second is noticed within a fraction of a second.
+        Retrying goes on for as long as max_retries sleeps of sleep_time
+        would have taken, however many attempts that takes, and there is
+        no sleep after the last attempt.
+        Attempts and time to success are recorded per call site in
+        snappy.tools.retry.retry_stats.
+
         @param func: The function to be called and tested.
         @type func: function
         @param func_args: arguments to be passed to the function call.
@@ -59,26 +89,61 @@ class ObjectStorageAPI_Behaviors(object):
                              is not provided, it will default to checking
                              response.ok.
         @type success_func: function
-        @param max_retries: Perform the function call up until the max
-                            number of retries. A default of 5 will be used
-                            if no value is passed in.
+        @param max_retries: The number of sleep_time sleeps to retry for.
+                            A default of 5 will be used if no value is
+                            passed in.  float('inf') retries until the
+                            deadline.
         @type max_retries: int
-        @param sleep_time: The time, in seconds, to sleep between function
-                           call retries. A default of 5 seconds will be
-                           used if no value is passed in.
+        @param sleep_time: The longest time, in seconds, to sleep between
+                           function call retries. A default of 5 seconds
+                           will be used if no value is passed in.
         @type sleep_time: int
+        @param deadline: If provided, stop retrying at this time, as
+                         returned by time.time(), even if max_retries
+                         hasn't been reached.
+        @type deadline: float
+        @param policy: If provided, used instead of the policy made from
+                       max_retries, sleep_time and deadline.
+        @type policy: snappy.tools.retry.RetryPolicy
+        @param call_site: name to record attempts and time to success
+                          under, defaults to the name of func.
+        @type call_site: string
 
         @return: The most resent response from calling func.
         @rtype: Response Object
         """
-        request_count = 0
-        func_args = func_args or []
-        func_kwargs = func_kwargs or {}
+        if policy is None:
+            policy = self.get_retry_policy(
+                max_retries=max_retries, sleep_time=sleep_time,
+                deadline=deadline)
+
+        result = policy.run(
+            func, func_args=func_args, func_kwargs=func_kwargs,
+            success_func=success_func, call_site=call_site)
+        self._log.debug('retry {0}'.format(result))
+
+        # Log the failure to obtain the success condition
+        if not result.succeeded:
+            self._log.debug('Unable to satisfy success condition within {0} '
+                            'attempts'.format(result.attempts))
+        # Still going to return the failed response, so the caller can deal
+        # with the response appropriately
+        return result.response
+
+    def get_retry_policy(self, max_retries=None, sleep_time=None,
+                         deadline=None):
+        """
+        Makes the RetryPolicy used by retry_until_success.
 
-        def default_success_func(response):
-            return response.ok
-        success_func = success_func or default_success_func
+        The policy retries for as long as max_retries sleeps of sleep_time
+        would take, backing off from retry_initial_sleep_time to
+        sleep_time.  Only the time is limited, not the number of attempts,
+        since polling starts out faster than once every sleep_time.
+        max_retries may be float('inf') to retry until the deadline.
 
+        @return: a retry policy
+        @rtype: snappy.tools.retry.RetryPolicy
+        """
         # Didn't get a value for max_retries, set to default value from config
         if not max_retries:
             max_retries = self.config.max_retry_count
@@ -87,35 +152,11 @@ class ObjectStorageAPI_Behaviors(object):
         if not sleep_time:
             sleep_time = self.config.retry_sleep_time
 
-        function_response = None
-        while request_count < max_retries:
-
-            # Call function that was passed in with its arguments
-            function_response = func(*func_args, **func_kwargs)
-
-            # Check the response with the success function
-            if success_func(function_response):
-                return function_response
-
-            # Still need to fix logging
-            # self._log.info('Retry - HTTP request attempt {} failed '
-            #                'success_func test.'.format(request_count))
-
-            request_count += 1
-            sleep(sleep_time)
-
-        if function_response.ok:
-            # If the response came back successful, but the success condition
-            # did not occur, then return the response anyway so the caller
-            # can deal with how to handle the situation.
-            return function_response
-
-        # Log the failure to obtain the success condition
-        self._log.debug('Unable to satisfy success condition within {0} '
-                        'retries'.format(max_retries))
-        # Still going to return the failed response, so the caller can deal
-        # with the response appropriately
-        return function_response
+        return RetryPolicy(
+            initial_delay=self.config.retry_initial_sleep_time,
+            max_delay=sleep_time,
+            timeout=max_retries * sleep_time,
+            deadline=deadline)
 
     def generate_unique_container_name(self, identifier=None):
         """
@@ -156,10 +197,47 @@ class ObjectStorageAPI_Behaviors(object):
         parts.append(str(uuid.uuid4()).replace('-', ''))
         return '_'.join(parts)
 
-    def get_swift_info(self):
+    def get_swift_info(self, refresh=False):
         """
         Returns a dictionary of info requested from swift.
+
+        The info is only requested once per swift endpoint per process.
+        If swift_info_cache_file is set in the config, it is also shared
+        with other processes through that file for swift_info_cache_ttl
+        seconds.
+
+        @param refresh: if True, ignore any cached info and request it
+                        again.
+        @type refresh: bool
         """
+        endpoint = self.client.swift_endpoint
+
+        with _swift_info_lock:
+            if not refresh and endpoint in _swift_info_cache:
+                return _swift_info_cache[endpoint]
+
+            cache_file_path = self.config.swift_info_cache_file
+            if cache_file_path:
+                cache_file = LockedJSONFile(cache_file_path)
+                with cache_file.locked():
+                    cached = cache_file.read()
+                    entry = cached.get(endpoint)
+                    if (refresh or not entry or
+                            entry.get('fetched_at', 0) +
+                            self.config.swift_info_cache_ttl < time()):
+                        entry = {'info': self._request_swift_info(),
+                                 'fetched_at': time()}
+                        cached[endpoint] = entry
+                        cache_file.write(cached)
+                info = entry['info']
+            else:
+                info = self._request_swift_info()
+
+            _swift_info_cache[endpoint] = info
+            self._feature_set = None
+            return info
+
+    def _request_swift_info(self):
         response = self.client.get_swift_info()
         if not response.ok:
             raise Exception('Could not load info from swift.')
@@ -174,22 +252,21 @@ class ObjectStorageAPI_Behaviors(object):
         features = ' '.join([k for k in info.viewkeys()])
         return features
 
-    def get_configured_features(self):
+    def get_configured_feature_set(self):
         """
-        Gets the available features.
+        Gets the available features, resolved once and cached.
 
         Builds features in the following order:
         1. Get features from swift.
         2. Get features from the config.
         3. Remove any features that are excluded in the config.
 
-        @return: white space separated feature names. or a string constant
-                 representing either all or no features are configured.
-        @rtype: string
+        @return: the feature names, or a string constant representing
+                 either all or no features are configured.
+        @rtype: frozenset or string
         """
-        reported_features = ''
-        if self.config.use_swift_info:
-            reported_features = self.get_swift_features()
+        if self._feature_set is not None:
+            return self._feature_set
 
         def split_features(features):
             if features == self.config.ALL_FEATURES:
@@ -202,30 +279,51 @@ class ObjectStorageAPI_Behaviors(object):
             self.config.excluded_features)
 
         if features == self.config.ALL_FEATURES:
-            return features
-
-        reported_features = reported_features.split()
-        features = list(set(reported_features) | set(features))
+            feature_set = features
+        elif excluded_features == self.config.ALL_FEATURES:
+            # If all features are to be ignored, skip
+            feature_set = self.config.NO_FEATURES
+        else:
+            reported_features = []
+            if self.config.use_swift_info:
+                reported_features = self.get_swift_features().split()
+            feature_set = frozenset(
+                (set(reported_features) | set(features)) -
+                set(excluded_features))
 
-        # If all features are to be ignored, skip
-        if excluded_features == self.config.ALL_FEATURES:
-            return self.config.NO_FEATURES
+        self._feature_set = feature_set
+        return feature_set
 
-        # Remove all features
-        for feature in excluded_features:
-            try:
-                index = features.index(feature)
-                features.pop(index)
-            except ValueError:
-                pass
+    def get_configured_features(self):
+        """
+        Gets the available features.  See get_configured_feature_set.
 
+        @return: white space separated feature names. or a string constant
+                 representing either all or no features are configured.
+        @rtype: string
+        """
+        features = self.get_configured_feature_set()
+        if features in (self.config.ALL_FEATURES, self.config.NO_FEATURES):
+            return features
         return ' '.join(features)
 
+    def has_features(self, *features):
+        """
+        Returns True if all of the features are available.
+        """
+        feature_set = self.get_configured_feature_set()
+        if feature_set == self.config.ALL_FEATURES:
+            return True
+        if feature_set == self.config.NO_FEATURES:
+            return False
+        return all(feature in feature_set for feature in features)
+
     def container_exists(self, name=None):
         path = '/{0}'.format(name)
         response = self.request('HEAD', path)
 
         if response.status_code == 404:
+            self.forget_container(name)
             return False
 
         if not response.ok:
@@ -233,8 +331,26 @@ class ObjectStorageAPI_Behaviors(object):
                 'Error checking the existence of container "{0}"'.format(
                     str(name)))
 
+        self._remember_container(name)
         return True
 
+    def _remember_container(self, name):
+        with self._known_containers_lock:
+            self._known_containers.add(name)
+
+    def forget_container(self, name):
+        """
+        Drops a container from the containers create_object assumes exist,
+        e.g. after deleting it with the client rather than with
+        force_delete_container.
+        """
+        with self._known_containers_lock:
+            self._known_containers.discard(name)
+
+    def _is_known_container(self, name):
+        with self._known_containers_lock:
+            return name in self._known_containers
+
     def create_container(self, container_name, log_delivery=False,
                          headers=None):
 
@@ -249,6 +365,8 @@ class ObjectStorageAPI_Behaviors(object):
             raise Exception(
                 'could not create container "{0}"'.format(str(container_name)))
 
+        self._remember_container(container_name)
+
     def list_containers(self, headers=None, params=None,
                         expected_containers=None, requestslib_kwargs=None):
         """
@@ -288,18 +406,42 @@ class ObjectStorageAPI_Behaviors(object):
                 'params': params,
                 'requestslib_kwargs': requestslib_kwargs},
             success_func=success_func,
-            max_retries=10)
+            max_retries=10,
+            call_site='list_containers')
         return response.entity
 
     def create_object(self, container_name, object_name, data=None,
-                      headers=None, params=None):
-        if not self.container_exists(container_name):
+                      headers=None, params=None, use_container_cache=True):
+        """
+        Creates an object, creating its container first if needed.
+
+        data can be a string, a file object, an mmap or an iterator of
+        chunks.  A content-length header is added for everything but
+        iterators, which are uploaded with chunked transfer-encoding unless
+        a content-length header is provided.
+
+        The container is only HEADed if this instance hasn't created it or
+        seen it exist before.  If the PUT gets a 404 because a known
+        container has since been deleted, the container is created again
+        and the PUT retried, unless data is an iterator, which can't be
+        sent twice.  Pass use_container_cache=False to always HEAD the
+        container, e.g. when racing a container delete on purpose.
+        """
+        known_container = (
+            use_container_cache and self._is_known_container(container_name))
+        if not known_container and not self.container_exists(container_name):
             self.create_container(container_name)
         if not headers:
             headers = {}
 
         if data and 'content-length' not in headers:
-            headers['content-length'] = str(len(data))
+            content_length = get_body_length(data)
+            if content_length is not None:
+                headers['content-length'] = str(content_length)
+
+        position = None
+        if known_container and hasattr(data, 'seek'):
+            position = data.tell()
 
         response = self.client.create_object(
             container_name,
@@ -308,10 +450,58 @@ class ObjectStorageAPI_Behaviors(object):
             headers=headers,
             params=params)
 
+        if response.status_code == 404:
+            self.forget_container(container_name)
+            resendable = (data is None or position is not None or
+                          isinstance(data, basestring))
+            if known_container and resendable:
+                if position is not None:
+                    data.seek(position)
+                return self.create_object(
+                    container_name, object_name, data=data,
+                    headers=headers, params=params)
+        elif response.ok:
+            self._remember_container(container_name)
+
         if not response.ok:
             raise Exception('could not create object "{0}/{1}"'.format(
                 container_name, object_name))
 
+    def create_objects(self, container_name, object_names, data=None,
+                       headers=None):
+        """
+        Creates objects with the same content concurrently, e.g. to seed a
+        container for listing tests.  The container must already exist.
+
+        @param container_name: container to create the objects in.
+        @type container_name: string
+        @param object_names: names of the objects to create.
+        @type object_names: list of strings
+        @param data: content of every object.
+        @type data: string
+        @param headers: headers to be added to every PUT.
+        @type headers: dictionary
+
+        @return: the responses to the PUTs, in the order of object_names.
+        @rtype: list of Response Objects
+        """
+        results = self.client.batch_create_objects(
+            [(container_name, object_name, data)
+             for object_name in object_names],
+            headers=headers)
+
+        responses = []
+        for result in results:
+            # Re-raises the exception if the request failed.
+            response = result.get()
+            if not response.ok:
+                raise ObjectStorageAPIBehaviorException(
+                    'could not create object "{0}/{1}"'.format(
+                        container_name, result.item[1]),
+                    response=response)
+            responses.append(response)
+        return responses
+
     def create_static_large_object(self, container_name, object_name,
                                    segments_info=None, manifest=None,
                                    headers=None):
@@ -370,8 +560,8 @@ class ObjectStorageAPI_Behaviors(object):
                     raise ObjectStorageAPIBehaviorException(
                         "Can't create a segment without a size")
 
-                segment_data = ''.join([choice(self.data_pool) for x in xrange(
-                    segment.get("segment_size"))])
+                segment_data = self.payload_generator.generate(
+                    segment.get("segment_size"))
                 segment_etag = md5(segment_data).hexdigest()
 
                 segment_response = self.client.create_object(
@@ -410,10 +600,11 @@ class ObjectStorageAPI_Behaviors(object):
             return manifest_response
 
     def decompress_object(self, container_name, object_name,
-                          headers=None, params=None, stream=False,
+                          headers=None, params=None,
                           requestslib_kwargs=None):
         """
-        decompresses the content of an object.
+        decompresses the content of an object.  The body is always streamed
+        and decompressed as it arrives.
 
         @param container_name: container name
         @type  container_name: string
@@ -436,15 +627,27 @@ class ObjectStorageAPI_Behaviors(object):
             object_name,
             headers=headers,
             params=params,
-            requestslib_kwargs={'stream': stream})
-
-        opened_file = gzip.GzipFile(
-            mode='rb',
-            fileobj=StringIO(response.content))
-        uncompressed_data = opened_file.readlines()
-        opened_file.close()
-
-        return uncompressed_data
+            stream=True)
+
+        # Decompress the body as it arrives rather than holding both the
+        # compressed and uncompressed content in memory.
+        decompressor = zlib.decompressobj(GZIP_WBITS)
+        uncompressed_data = []
+        try:
+            for chunk in response.iter_content(chunk_size=DEFAULT_CHUNK_SIZE):
+                while chunk:
+                    uncompressed_data.append(decompressor.decompress(chunk))
+                    # A gzip stream can hold several members, start a new
+                    # decompressor for any data after the end of one.
+                    chunk = decompressor.unused_data
+                    if chunk:
+                        uncompressed_data.append(decompressor.flush())
+                        decompressor = zlib.decompressobj(GZIP_WBITS)
+            uncompressed_data.append(decompressor.flush())
+        finally:
+            response.close()
+
+        return ''.join(uncompressed_data).splitlines(True)
 
     def request(self, method=None, path='', **kwargs):
         """
@@ -508,7 +711,8 @@ class ObjectStorageAPI_Behaviors(object):
             func_args=[container_name],
             func_kwargs={'requestslib_kwargs': requestslib_kwargs},
             success_func=success_func,
-            max_retries=10)
+            max_retries=10,
+            call_site='get_object_count')
 
         return int(response.headers.get('x-container-object-count'))
 
@@ -554,7 +758,8 @@ class ObjectStorageAPI_Behaviors(object):
                 'params': params,
                 'requestslib_kwargs': requestslib_kwargs},
             success_func=success_func,
-            max_retries=10)
+            max_retries=10,
+            call_site='list_objects')
         return response.entity
 
     def authed_request(self, method=None, path='', **kwargs):
@@ -662,51 +867,171 @@ class ObjectStorageAPI_Behaviors(object):
         if not key_two_response.ok:
             raise Exception('Could not set TempURL key two.')
 
+    def get_bulk_delete_max_count(self):
+        """
+        @summary: Returns the max number of objects to delete per bulk
+        delete request, or None if swift's /info doesn't report the bulk
+        delete middleware.
+        """
+        try:
+            info = self.get_swift_info()
+        except Exception:
+            return None
+
+        if 'bulk_delete' not in info:
+            return None
+
+        max_count = self.config.bulk_delete_max_count
+        max_deletes = (info.get('bulk_delete') or {}).get(
+            'max_deletes_per_request')
+        if max_deletes:
+            max_count = min(max_count, max_deletes)
+        return max_count
+
+    @staticmethod
+    def _parse_bulk_delete_response(response):
+        """
+        @summary: Parses the JSON body of a bulk delete response.
+
+        @return: the names and statuses of the objects that could not be
+                 deleted, or None if the request as a whole failed.
+        @rtype: list of tuples
+        """
+        if not response.ok:
+            return None
+
+        try:
+            body = json.loads(response.content)
+        except ValueError:
+            return None
+
+        # Swift reports a 400 when some of the objects couldn't be deleted,
+        # in which case they are listed in Errors.
+        errors = body.get('Errors') or []
+        if not errors and not body.get('Response Status', '').startswith('2'):
+            return None
+
+        return [(name, status) for name, status in errors]
+
+    def _delete_objects(self, container_name, object_names, max_count=None,
+                        requestslib_kwargs=None):
+        """
+        @summary: Deletes objects with bulk delete requests of up to
+        max_count objects, or with concurrent single deletes if max_count
+        is None or a bulk delete request fails as a whole.
+
+        @return: the names and statuses of the objects that could not be
+                 deleted.  Objects that were already gone aren't included.
+        @rtype: list of tuples
+        """
+        failures = []
+        single_deletes = []
+
+        if max_count:
+            for start in xrange(0, len(object_names), max_count):
+                batch = object_names[start:start + max_count]
+                response = self.client.bulk_delete(
+                    ['/{0}/{1}'.format(container_name, name.encode('utf-8'))
+                     for name in batch],
+                    headers={'Accept': 'application/json'},
+                    requestslib_kwargs=requestslib_kwargs)
+
+                batch_failures = self._parse_bulk_delete_response(response)
+                if batch_failures is None:
+                    self._log.debug(
+                        'bulk delete from {0} failed with status {1}, '
+                        'deleting objects one at a time'.format(
+                            container_name, response.status_code))
+                    single_deletes.extend(batch)
+                else:
+                    failures.extend(batch_failures)
+        else:
+            single_deletes = object_names
+
+        if single_deletes:
+            results = self.client.batch(
+                self.delete_unicode_object,
+                [(container_name, name) for name in single_deletes])
+            for result in results:
+                if result.error is not None:
+                    failures.append((result.item[1], repr(result.error)))
+                elif not (result.result.ok or
+                          result.result.status_code == 404):
+                    failures.append(
+                        (result.item[1], result.result.status_code))
+
+        return failures
+
+    def _purge_objects(self, container_name, object_names, max_count,
+                       requestslib_kwargs=None):
+        failures = self._delete_objects(
+            container_name, object_names, max_count=max_count,
+            requestslib_kwargs=requestslib_kwargs)
+        for object_name, status in failures:
+            self._log.debug(
+                'purge of {0} failed to delete {1}: {2}'.format(
+                    container_name, object_name, status))
+
     def _purge_container(self, container_name, max_recursion, call_count=1,
                          requestslib_kwargs=None):
         """
-        @summary: List all the objects in a container and then attempt to
-        delete them all. List the objects again and recursively call
-        _purge_container if the container listing returns a 200 (indicating
+        @summary: List all the objects in a container with iter_objects,
+        which pages through the listing with marker, and delete them in
+        batches of up to bulk_delete_max_count with bulk delete.  If bulk
+        delete isn't reported by swift's /info, the objects are deleted
+        with concurrent single deletes instead.  List the objects again and
+        purge again if the container listing returns a 200 (indicating
         that there are still objects left).
 
         @param container_name: name of a container
         @type container_name: string
-        @param max_recursion:  the maximum number of times for this method
-                               to recursively call itself.
+        @param max_recursion:  the maximum number of times to purge again.
         @type max_recursion:   int
-        @param call_count: the number of iterations that have been recursively
-                           called, defaults to 1.
+        @param call_count: the number of purges that have already been
+                           attempted plus one, defaults to 1.
         @type call_count:  int
         """
+        max_count = self.get_bulk_delete_max_count()
+        batch_size = max_count or self.config.bulk_delete_max_count
 
-        params = {'format': 'json'}
-        list_response = self.client.list_objects(
-            container_name,
-            params=params,
-            requestslib_kwargs=requestslib_kwargs)
-
-        for storage_object in list_response.entity:
-            self.delete_unicode_object(container_name,
-                                       storage_object.name)
-
-        list_response = self.client.list_objects(container_name)
+        while True:
+            object_names = []
+            try:
+                for storage_object in self.client.iter_objects(
+                        container_name,
+                        requestslib_kwargs=requestslib_kwargs):
+                    object_names.append(storage_object.name)
+                    if len(object_names) >= batch_size:
+                        self._purge_objects(
+                            container_name, object_names, max_count,
+                            requestslib_kwargs)
+                        object_names = []
+            except ObjectStorageListingException as e:
+                # There is nothing to purge from a container that's gone.
+                if e.response.status_code == 404:
+                    return
+                raise
+            if object_names:
+                self._purge_objects(
+                    container_name, object_names, max_count,
+                    requestslib_kwargs)
+
+            list_response = self.client.list_objects(
+                container_name, params={'limit': 1})
+
+            # If the list response returns objects, purge again
+            if list_response.status_code != 200:
+                return
 
-        # If the list response returns objects, purge again
-        if list_response.status_code == 200:
             if call_count > max_recursion:
                 self._log_cleanup_failure(container_name)
                 raise Exception('Failed to purge objects from {0} '
                                 'after {1} tries.'.format(container_name,
                                                           call_count))
-            else:
-                self._purge_container(container_name,
-                                      max_recursion=max_recursion,
-                                      call_count=call_count + 1,
-                                      requestslib_kwargs=requestslib_kwargs)
+            call_count += 1
 
     def force_delete_container(self, container_name,
-                               requestslib_kwargs=None):
+                               requestslib_kwargs=None, deadline=None):
         """
         @summary: Calls purge container to delete all the objects in a
         container. Then it will attempt to delete the container with a retry
@@ -715,22 +1040,39 @@ class ObjectStorageAPI_Behaviors(object):
 
         @param container_name: Name of container to purge and delete
         @type container_name: string
+        @param deadline: If provided, stop retrying the container delete at
+                         this time, as returned by time.time(), instead of
+                         after max_retry_count retries.  The delete is always
+                         retried at least once.
+        @type deadline: float
         """
 
         def success_func(response):
             return response.status_code == 204 or response.status_code == 404
 
+        self.forget_container(container_name)
         self._purge_container(container_name,
                               max_recursion=30,
                               requestslib_kwargs=requestslib_kwargs)
 
+        max_retries = self.config.max_retry_count
+        sleep_time = self.config.retry_sleep_time
+        if deadline is not None:
+            # The deadline is shared with other containers, so don't let
+            # it stop this one from retrying a conflict at least once.
+            deadline = max(deadline, time() + sleep_time)
+            # Retry for as long as the deadline allows.
+            max_retries = float('inf')
+
         delete_response = self.retry_until_success(
             self.client.delete_container,
             func_args=[container_name],
             func_kwargs={'requestslib_kwargs': requestslib_kwargs},
             success_func=success_func,
-            max_retries=self.config.max_retry_count,
-            sleep_time=self.config.retry_sleep_time)
+            max_retries=max_retries,
+            sleep_time=sleep_time,
+            deadline=deadline,
+            call_site='force_delete_container')
 
         if delete_response.status_code == 409:
             self._log.debug("force delete failure {0} status {1}".format(
@@ -739,16 +1081,47 @@ class ObjectStorageAPI_Behaviors(object):
             self._log_cleanup_failure(container_name)
 
     def force_delete_containers(self, container_list,
-                                requestslib_kwargs=None):
+                                requestslib_kwargs=None, concurrency=None):
         """
-        @summary: Calls force_delete_container on a list of containers
+        @summary: Calls force_delete_container on a list of containers,
+        tearing down up to concurrency containers at once.
+
+        While one container waits for a 409 conflict to clear, the others
+        are purged and deleted.  The max_retry_count * retry_sleep_time
+        that a container may wait for its conflict to clear is a deadline
+        shared by all of the containers, so tearing down many containers
+        takes about as long as the slowest one rather than all of them
+        added together.
 
         @param container_list: a list of containers
         @type container_list: list
+        @param concurrency: max number of containers torn down at once,
+                            defaults to the client's batch_concurrency.
+        @type concurrency: int
         """
-        for container_name in container_list:
+        container_list = list(container_list)
+        if len(container_list) == 1:
+            self.force_delete_container(
+                container_list[0], requestslib_kwargs=requestslib_kwargs)
+            return
+
+        deadline = time() + (
+            self.config.max_retry_count * self.config.retry_sleep_time)
+
+        def force_delete_container(container_name):
             self.force_delete_container(
-                container_name, requestslib_kwargs=requestslib_kwargs)
+                container_name, requestslib_kwargs=requestslib_kwargs,
+                deadline=deadline)
+
+        results = run_concurrently(
+            force_delete_container,
+            container_list,
+            concurrency or self.client.batch_concurrency)
+
+        # Every container has been attempted, raise the first failure.
+        for result in results:
+            if result.error is not None:
+                result.get()
 
     def create_formpost(self, container, files, object_prefix='',
                         redirect='http://example.com/formpost',
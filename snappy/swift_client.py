@@ -1,26 +1,157 @@
 import hmac
 import requests
-import tarfile
+import threading
 import urllib
-from cStringIO import StringIO
-from datetime import datetime
-from hashlib import sha1, sha256
+from hashlib import md5, sha1, sha256
 from os.path import expanduser
-from time import time, mktime
+from time import time
 from urlparse import urlparse
 
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.connectionpool import (
+    HTTPConnectionPool, HTTPSConnectionPool)
+
 from snappy.tools import randomstring as randstring
 from snappy.tools.md5hash import get_md5_hash
-
-from swift_models import AccountContainersList, ContainerObjectsList
+from snappy.tools.streaming import (
+    DEFAULT_CHUNK_SIZE, IterableBody, get_body_length, is_chunk_iterator)
+from snappy.tools.tar_stream import (
+    SUPPORTED_COMPRESSION, get_extract_archive_param, iter_tar_archive)
+from snappy.tools.worker_pool import WorkerPool, run_concurrently
+from snappy.swift_instrumentation import (
+    CountingIterator, RequestHooks, RequestTiming, get_url_template)
+
+from swift_models import (
+    AccountContainersList, ContainerObjectsList, ObjectDownload)
 from snappy.common.deserialization_decorator import deserialize
 
 BULK_ARCHIVE_NAME = 'bulk_objects'
 
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_BATCH_CONCURRENCY = 10
+
+
+class ObjectStorageListingException(Exception):
+    def __init__(self, message, response=None):
+        super(ObjectStorageListingException, self).__init__(message)
+        self.response = response
+
+
+class ConnectionStats(object):
+    """
+    Thread safe counters for the requests sent through a pooled session and
+    the connections that had to be opened to send them.  Any request that
+    did not open a new connection was sent over a reused one.
+
+    The time spent connecting is also tracked per thread, between calls to
+    start_request_timing and get_request_connect_time, so it can be
+    attributed to the request that thread is sending.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self, connect_time=0.0):
+        with self._lock:
+            self.new_connections += 1
+        self._local.connect_time = (
+            getattr(self._local, 'connect_time', 0.0) + connect_time)
+
+    def start_request_timing(self):
+        self._local.connect_time = 0.0
+
+    def get_request_connect_time(self):
+        return getattr(self._local, 'connect_time', 0.0)
+
+    @property
+    def reused_connections(self):
+        return max(self.requests - self.new_connections, 0)
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+
+    def as_dict(self):
+        return {'requests': self.requests,
+                'new_connections': self.new_connections,
+                'reused_connections': self.reused_connections}
+
+
+def _counting_pool_class(pool_class, stats):
+    """
+    Returns a subclass of pool_class whose connections record every
+    connect() call, i.e. every new TCP/TLS connection, and how long it
+    took on stats.
+    """
+    base_connection_class = pool_class.ConnectionCls
+
+    class CountingConnection(base_connection_class):
+        def connect(self):
+            start = time()
+            try:
+                return base_connection_class.connect(self)
+            finally:
+                stats.record_connection(time() - start)
+
+    return type(
+        'Counting{0}'.format(pool_class.__name__),
+        (pool_class,),
+        {'ConnectionCls': CountingConnection})
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that counts requests sent and connections opened so that
+    connection reuse by the underlying pool can be verified.
+    """
+    def __init__(self, stats=None, **kwargs):
+        # init_poolmanager is called from HTTPAdapter.__init__, so stats has
+        # to be available before calling super.
+        self.stats = stats or ConnectionStats()
+        super(PooledHTTPAdapter, self).__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(PooledHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool_class(HTTPConnectionPool, self.stats),
+            'https': _counting_pool_class(HTTPSConnectionPool, self.stats)}
+
+    def send(self, request, **kwargs):
+        self.stats.record_request()
+        return super(PooledHTTPAdapter, self).send(request, **kwargs)
+
 
 class ObjectStorageAPIClient(object):
     def __init__(self, storage_url, auth_token, base_container_name=None,
-                 base_object_name=None):
+                 base_object_name=None, pool_connections=None,
+                 pool_maxsize=None, keep_alive=True, batch_concurrency=None,
+                 deserialize_responses=True):
+        """
+        @param pool_connections: number of per host connection pools to
+                                 keep in the session.
+        @type pool_connections: int
+        @param pool_maxsize: max number of connections kept open per host.
+        @type pool_maxsize: int
+        @param keep_alive: if False, every request asks the server to close
+                           the connection once the response is sent.
+        @type keep_alive: bool
+        @param batch_concurrency: default number of requests the batch_*
+                                  methods run at once.
+        @type batch_concurrency: int
+        @param deserialize_responses: if False, responses from listing
+                                      methods are never deserialized and
+                                      their entity is None, unless they
+                                      were streamed.
+        @type deserialize_responses: bool
+        """
         super(ObjectStorageAPIClient, self).__init__()
 
         # This should be passed in instead of being instantiated on its own
@@ -42,6 +173,53 @@ class ObjectStorageAPIClient(object):
         }
         self._swift_features = None
 
+        self.batch_concurrency = (
+            batch_concurrency or DEFAULT_BATCH_CONCURRENCY)
+        self.deserialize_responses = deserialize_responses
+
+        self.request_hooks = RequestHooks()
+        self.connection_stats = ConnectionStats()
+        self.session = self._create_session(
+            pool_connections or DEFAULT_POOL_CONNECTIONS,
+            pool_maxsize or DEFAULT_POOL_MAXSIZE,
+            keep_alive)
+
+    def _create_session(self, pool_connections, pool_maxsize, keep_alive):
+        """
+        Creates the requests session used for every call made by the client,
+        so that connections to the proxy are pooled and kept alive between
+        requests instead of being opened for each one.
+        """
+        session = requests.Session()
+        adapter = PooledHTTPAdapter(
+            stats=self.connection_stats,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        if not keep_alive:
+            session.headers['Connection'] = 'close'
+
+        return session
+
+    def close(self):
+        """
+        Closes all pooled connections held by the client's session.
+        """
+        self.session.close()
+
+    def add_request_hook(self, hook):
+        """
+        Registers a callable to be called with a RequestTiming after every
+        request made by the client.  See swift_instrumentation for hooks
+        that log, aggregate or export the timings.
+        """
+        self.request_hooks.add(hook)
+
+    def remove_request_hook(self, hook):
+        self.request_hooks.remove(hook)
+
     def request(
             self, method, url, headers=None, params=None, data=None,
             requestslib_kwargs=None):
@@ -86,7 +264,62 @@ class ObjectStorageAPIClient(object):
                                   **requestslib_kwargs)
 
         # Make the request
-        return requests.request(method, url, **requestslib_kwargs)
+        if not self.request_hooks:
+            return self.session.request(method, url, **requestslib_kwargs)
+        return self._timed_request(method, url, requestslib_kwargs)
+
+    def _timed_request(self, method, url, requestslib_kwargs):
+        """
+        Makes the request and notifies the request hooks of its timing,
+        whether it succeeded or raised.
+        """
+        data = requestslib_kwargs.get('data')
+        body_counter = None
+        if is_chunk_iterator(data):
+            body_counter = CountingIterator(data)
+            requestslib_kwargs['data'] = iter(body_counter)
+            bytes_sent = None
+        elif data is None:
+            bytes_sent = 0
+        else:
+            bytes_sent = get_body_length(data)
+
+        response = None
+        error = None
+        self.connection_stats.start_request_timing()
+        start = time()
+        try:
+            response = self.session.request(method, url, **requestslib_kwargs)
+            return response
+        except Exception as error:
+            raise
+        finally:
+            total_time = time() - start
+            if body_counter is not None:
+                bytes_sent = body_counter.bytes_read
+
+            timing = RequestTiming(
+                method, url,
+                get_url_template(url, self.storage_url, self.swift_endpoint),
+                bytes_sent=bytes_sent,
+                connect_time=self.connection_stats.get_request_connect_time(),
+                total_time=total_time,
+                error=error)
+
+            if response is not None:
+                timing.status_code = response.status_code
+                timing.time_to_first_byte = response.elapsed.total_seconds()
+                timing.trans_id = response.headers.get('X-Trans-Id')
+                if requestslib_kwargs.get('stream'):
+                    content_length = response.headers.get('Content-Length')
+                    if content_length is not None:
+                        timing.bytes_received = int(content_length)
+                else:
+                    timing.bytes_received = len(response.content or '')
+                retries = getattr(response.raw, 'retries', None)
+                timing.retries = len(getattr(retries, 'history', None) or ())
+
+            self.request_hooks.notify(timing)
 
     def put(self, url, **kwargs):
         """ HTTP PUT request """
@@ -201,6 +434,36 @@ class ObjectStorageAPIClient(object):
 
         return response
 
+    def iter_containers(self, headers=None, params=None, prefetch=True,
+                        requestslib_kwargs=None):
+        """
+        Yields every container in the account, following the listing's
+        marker across as many pages as it takes.
+
+        Only the current page and the next one are held in memory, however
+        many containers there are.  A page that fails raises an
+        ObjectStorageListingException, see _iter_listing.
+
+        @param headers: headers to be added to every listing request.
+        @type headers: dictionary
+        @param params: query string parameters to be added to every listing
+                       request, e.g. prefix, delimiter, end_marker or limit
+                       for the page size.  format is always json.
+        @type params: dictionary
+        @param prefetch: if True, the next page is requested while the
+                         current one is consumed.
+        @type prefetch: bool
+        @param requestslib_kwargs: keyword arguments to be passed on to
+                                   python requests.
+        @type requestslib_kwargs: dictionary
+
+        @return: a generator of Container
+        @rtype: generator
+        """
+        return self._iter_listing(
+            self.list_containers, [], headers=headers, params=params,
+            prefetch=prefetch, requestslib_kwargs=requestslib_kwargs)
+
     # Container--------------------------------------------------------------
 
     def get_container_metadata(self, container_name, headers=None,
@@ -295,6 +558,101 @@ class ObjectStorageAPIClient(object):
 
         return response
 
+    def iter_objects(self, container_name, headers=None, params=None,
+                     prefetch=True, requestslib_kwargs=None):
+        """
+        Yields every object in the specified container, following the
+        listing's marker across as many pages as it takes.
+
+        Only the current page and the next one are held in memory, however
+        many objects there are.  With a delimiter, pseudo-directories are
+        yielded as StorageObjects with subdir set.  A page that fails
+        raises an ObjectStorageListingException, see _iter_listing.
+
+        @param container_name: container to list the objects from.
+        @type container_name: string
+        @param headers: headers to be added to every listing request.
+        @type headers: dictionary
+        @param params: query string parameters to be added to every listing
+                       request, e.g. prefix, delimiter, end_marker or limit
+                       for the page size.  format is always json.
+        @type params: dictionary
+        @param prefetch: if True, the next page is requested while the
+                         current one is consumed.
+        @type prefetch: bool
+        @param requestslib_kwargs: keyword arguments to be passed on to
+                                   python requests.
+        @type requestslib_kwargs: dictionary
+
+        @return: a generator of StorageObject
+        @rtype: generator
+        """
+        return self._iter_listing(
+            self.list_objects, [container_name], headers=headers,
+            params=params, prefetch=prefetch,
+            requestslib_kwargs=requestslib_kwargs)
+
+    def _iter_listing(self, list_func, list_args, headers=None, params=None,
+                      prefetch=True, requestslib_kwargs=None):
+        """
+        Pages through a json listing with list_func, passing the name of
+        the last entry of each page as the marker for the next one.
+
+        Listing stops at a 204, at an empty page or at a page shorter than
+        a limit given in params.  Any other response raises an
+        ObjectStorageListingException, with the response attached, so that
+        a listing cut short by an error isn't taken for a complete one.
+        The listing's own marker, if any, is where the first page starts.
+        """
+        params = dict(params or {})
+        params['format'] = 'json'
+        limit = params.get('limit')
+        limit = int(limit) if limit is not None else None
+        # Pages are parsed as they are read rather than held in memory
+        # along with their models, see deserialize.
+        requestslib_kwargs = dict(requestslib_kwargs or {}, stream=True)
+
+        def get_page(marker):
+            page_params = dict(params)
+            if marker is not None:
+                page_params['marker'] = marker
+            response = list_func(
+                *list_args, headers=dict(headers or {}), params=page_params,
+                requestslib_kwargs=dict(requestslib_kwargs))
+            if response.status_code == 204:
+                return []
+            if response.status_code != 200:
+                raise ObjectStorageListingException(
+                    'listing {0} after marker {1!r} failed with a {2}'.format(
+                        response.url, marker, response.status_code),
+                    response=response)
+            return response.entity or []
+
+        pool = WorkerPool(1) if prefetch else None
+        try:
+            page = get_page(params.pop('marker', None))
+            while page:
+                last = page[-1]
+                marker = last.name if last.name is not None else last.subdir
+
+                next_page = None
+                is_last_page = limit is not None and len(page) < limit
+                if not is_last_page and pool is not None:
+                    next_page = pool.submit(get_page, marker)
+
+                for entry in page:
+                    yield entry
+
+                if is_last_page:
+                    return
+                if next_page is not None:
+                    page = next_page.get()
+                else:
+                    page = get_page(marker)
+        finally:
+            if pool is not None:
+                pool.close()
+
     # Storage Object--------------------------------------------------------
 
     def get_object(self, container_name, object_name, headers=None,
@@ -336,17 +694,96 @@ class ObjectStorageAPIClient(object):
 
         return response
 
+    def download_object(self, container_name, object_name, sink=None,
+                        headers=None, params=None,
+                        chunk_size=DEFAULT_CHUNK_SIZE,
+                        requestslib_kwargs=None):
+        """
+        Streams an object's body through a running md5 instead of loading it
+        into response.content.
+
+        @param sink: where the body is written as it arrives.  Either an
+                     object with a write() method, such as a file, or a
+                     bytearray, which is extended.  If None, the body is
+                     discarded once hashed.
+        @type sink: file or bytearray
+        @param chunk_size: number of bytes read from the socket at a time.
+        @type chunk_size: int
+
+        @return: the md5 and size of the body received, the time from
+                 sending the request to receiving the first byte of the
+                 body, the total time and the response itself.  The
+                 response's body has already been consumed.
+        @rtype: ObjectDownload
+        """
+        url = '{0}/{1}/{2}'.format(
+            self.storage_url,
+            container_name,
+            object_name)
+
+        requestslib_kwargs = dict(requestslib_kwargs or {}, stream=True)
+
+        start = time()
+        response = self.get(
+            url,
+            headers=headers,
+            params=params,
+            requestslib_kwargs=requestslib_kwargs)
+
+        if isinstance(sink, bytearray):
+            write = sink.extend
+        elif sink is not None:
+            write = sink.write
+        else:
+            write = None
+
+        digest = md5()
+        size = 0
+        time_to_first_byte = None
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if time_to_first_byte is None:
+                    time_to_first_byte = time() - start
+                digest.update(chunk)
+                size += len(chunk)
+                if write is not None:
+                    write(chunk)
+        finally:
+            response.close()
+
+        elapsed = time() - start
+        if time_to_first_byte is None:
+            time_to_first_byte = elapsed
+
+        return ObjectDownload(
+            response=response,
+            md5=digest.hexdigest(),
+            size=size,
+            time_to_first_byte=time_to_first_byte,
+            elapsed=elapsed)
+
     def create_object(self, container_name, object_name, data=None,
                       headers=None, params=None,
                       requestslib_kwargs=None):
         """
         Creates a storage object in a container via PUT
+
+        data can be a string, a file object, an mmap or an iterator of
+        chunks.  Files and mmaps are streamed from their current position
+        with a Content-Length.  Iterators are sent with chunked
+        transfer-encoding, unless a Content-Length header is provided, in
+        which case they are streamed with that Content-Length instead.
         """
         url = '{0}/{1}/{2}'.format(
             self.storage_url,
             container_name,
             object_name)
 
+        content_length = [value for key, value in (headers or {}).items()
+                          if key.lower() == 'content-length']
+        if content_length and is_chunk_iterator(data):
+            data = IterableBody(data, content_length[0])
+
         response = self.put(
             url,
             data=data,
@@ -383,6 +820,10 @@ class ObjectStorageAPIClient(object):
         if the upload path is container_foo/bar then the objects will
         be extracted to container_foo with the obj name prefix of 'bar'
         ie bar/file1/name1, bar/file2/name2, bar/file3...bar/file_n
+
+        data may be the archive's content, an open archive file or a
+        generator from create_archive_stream, which is sent with chunked
+        transfer-encoding as it is generated.
         """
         url = '{0}/{1}'.format(
             self.storage_url,
@@ -499,6 +940,38 @@ class ObjectStorageAPIClient(object):
 
         return {'target_url': base_url, 'signature': sig, 'expires': expires}
 
+    def create_archive_stream(self, objects, compression_type=None):
+        """
+        Generates an archive for create_archive_object a chunk at a time,
+        so it is sent with chunked transfer-encoding without being written
+        to disk or held in memory.
+
+        Usage:
+            client.create_archive_object(
+                client.create_archive_stream(object_names, 'gz'),
+                'tar.gz', upload_path=container_name)
+
+        @type  objects: iterable
+        @param objects: the objects to archive.  Each one is either an
+            object name, whose data will be the md5sum of the name as with
+            create_archive, or a (name, data) or (name, data, size) tuple.
+            See tar_stream.iter_tar_archive for the supported data.
+
+        @type  compression_type: string
+        @param compression_type: None, 'gz' or 'bz2'
+
+        @rtype:  generator
+        @return: the archive's chunks
+        """
+        def get_members():
+            for obj in objects:
+                if isinstance(obj, basestring):
+                    yield (obj, get_md5_hash(obj))
+                else:
+                    yield obj
+
+        return iter_tar_archive(get_members(), compression_type)
+
     def create_archive(self, object_names, compression_type,
                        archive_name=BULK_ARCHIVE_NAME):
         """
@@ -506,6 +979,9 @@ class ObjectStorageAPIClient(object):
         engine config. Each object's data will be the md5sum of the object's
         name.
 
+        To upload an archive without writing it to disk, use
+        create_archive_stream instead.
+
         @type  object_names: strings
         @param object_names: a list of object names
 
@@ -516,47 +992,24 @@ class ObjectStorageAPIClient(object):
         @return: Returns full path of the archive that was created in
         opencafe's temp directory specified in the engine config
         """
-        supported = [None, "gz", "bz2"]
-        if compression_type not in supported:
-            raise NameError("supported compression: {0}".format(supported))
-
-        ext = ''
-
-        if not compression_type:
-            ext = 'tar'
-            compression_type = ''
-        else:
-            ext = 'tar.{0}'.format(compression_type)
+        if compression_type not in SUPPORTED_COMPRESSION:
+            raise NameError(
+                "supported compression: {0}".format(SUPPORTED_COMPRESSION))
 
         archive_name = '{0}_{1}.{2}'.format(
             archive_name,
             randstring.get_random_string(),
-            ext)
-
-        archive_filename = '{0}/{1}'.format(self.temp_dir, archive_name)
-        archive = tarfile.open(
-            archive_filename,
-            'w:{0}'.format(compression_type))
-
-        for object_name in object_names:
-            object_data = get_md5_hash(object_name)
-            object_size = len(object_data)
-            object_time = int(mktime(datetime.now().timetuple()))
-
-            object_buffer = StringIO(object_data)
-            object_buffer.seek(0)
-
-            object_info = tarfile.TarInfo(name=object_name)
-            object_info.size = object_size
-            object_info.mtime = object_time
-
-            archive.addfile(tarinfo=object_info, fileobj=object_buffer)
-        archive.close()
+            get_extract_archive_param(compression_type))
 
         archive_path = "{0}/{1}".format(
             self.temp_dir,
             archive_name)
 
+        with open(archive_path, 'wb') as archive:
+            for chunk in self.create_archive_stream(
+                    object_names, compression_type):
+                archive.write(chunk)
+
         return archive_path
 
     def bulk_delete(self, targets, headers=None, requestslib_kwargs=None):
@@ -584,3 +1037,84 @@ class ObjectStorageAPIClient(object):
             requestslib_kwargs=requestslib_kwargs)
 
         return response
+
+    # Batch------------------------------------------------------------------
+
+    def batch(self, func, items, concurrency=None):
+        """
+        Calls func once per item over a pool of worker threads.
+
+        @param func: client method, or any other function, to call.
+        @type func: function
+        @param items: a tuple of positional arguments for each call.
+        @type items: list of tuples
+        @param concurrency: the max number of calls in flight at once,
+                            defaults to the client's batch_concurrency.
+                            The session keeps at most pool_maxsize
+                            connections per host alive, so higher values
+                            will open new connections.
+        @type concurrency: int
+
+        @return: one TaskResult per item, in input order.  Each result's
+                 'result' is the response from the call, or 'error' is the
+                 exception raised by it.
+        @rtype: list of TaskResult
+        """
+        return run_concurrently(
+            func, items, concurrency or self.batch_concurrency, unpack=True)
+
+    def batch_create_objects(self, objects, headers=None, params=None,
+                             concurrency=None):
+        """
+        Creates many storage objects concurrently.
+
+        @param objects: (container_name, object_name, data) for each object.
+        @type objects: list of tuples
+        @param headers: headers to be added to every PUT.
+        @type headers: dictionary
+        @param params: query string parameters to be added to every PUT.
+        @type params: dictionary
+
+        @return: one TaskResult per object, in input order.
+        @rtype: list of TaskResult
+        """
+        def create_object(container_name, object_name, data=None):
+            return self.create_object(
+                container_name, object_name, data=data,
+                headers=dict(headers or {}), params=params)
+
+        return self.batch(create_object, objects, concurrency=concurrency)
+
+    def batch_get_object_metadata(self, container_name, object_names,
+                                  headers=None, concurrency=None):
+        """
+        HEADs many objects in a container concurrently.
+
+        @return: one TaskResult per object name, in input order.
+        @rtype: list of TaskResult
+        """
+        def get_object_metadata(object_name):
+            return self.get_object_metadata(
+                container_name, object_name, headers=dict(headers or {}))
+
+        return self.batch(
+            get_object_metadata,
+            [(object_name,) for object_name in object_names],
+            concurrency=concurrency)
+
+    def batch_delete_objects(self, container_name, object_names,
+                             headers=None, concurrency=None):
+        """
+        Deletes many objects in a container concurrently.
+
+        @return: one TaskResult per object name, in input order.
+        @rtype: list of TaskResult
+        """
+        def delete_object(object_name):
+            return self.delete_object(
+                container_name, object_name, headers=dict(headers or {}))
+
+        return self.batch(
+            delete_object,
+            [(object_name,) for object_name in object_names],
+            concurrency=concurrency)
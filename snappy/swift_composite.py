@@ -1,74 +1,159 @@
+from snappy.swift_auth import AuthTokenCache, authenticate
 from snappy.swift_behaviors import ObjectStorageAPI_Behaviors
 from snappy.swift_client import ObjectStorageAPIClient
 from snappy.swift_config import (ObjectStorageAPIConfig, ObjectStorageConfig,
                                  UserAuthConfig, UserConfig)
-from behest.client import HTTPClient
+from snappy.swift_instrumentation import RequestTimingFileExporter
+from snappy.swift_waiters import ObjectStorageWaiters
 
-import json
 import os
+import threading
 
 
 class ObjectStorageComposite(object):
     """
     Handles authing and retrieving the storage_url and auth_token for
     storage objects.
+
+    Nothing is read, authenticated or created until it is first used, so
+    building a composite, e.g. while test modules are being imported and
+    collected, does no network I/O.  Use ObjectStorageComposite.session()
+    to share one composite, and its client and behaviors, across the whole
+    test session.
     """
-    def __init__(self):
-        def authenticate(url, username, api_key):
-            client = HTTPClient()
-            content = {
-                "auth": {
-                    "RAX-KSKEY:apiKeyCredentials": {
-                        "username": username,
-                        "apiKey": api_key
-                    }
-                }
-            }
-            body = json.dumps(content)
-            response = client.request(
-                "POST",
-                os.path.join(url, 'v2.0/tokens'),
-                data=body,
-                headers={'Content-type': 'application/json'})
-
-            return response
-
-        config_file_path = os.environ['TEST_CONFIG']
-        user_auth_config = UserAuthConfig(
-            config_file_path=config_file_path,
-            section_name=UserAuthConfig.SECTION_NAME)
-
-        user_config = UserConfig(
-            config_file_path=config_file_path,
-            section_name=UserConfig.SECTION_NAME)
-
-        obj_storage_config = ObjectStorageConfig()
-        os_service_name = obj_storage_config.identity_service_name
-
-        r = authenticate(
-            url=user_auth_config.auth_endpoint,
-            username=user_config.username,
-            api_key=user_config.api_key)
-
-        services = r.json()['access']['serviceCatalog']
-
-        swift_service = [service for service in services
-                         if service['name'] == os_service_name]
-
-        swift_service = swift_service[0]
-
-        swift_endpoint = [endpoint for endpoint in swift_service['endpoints']
-                          if endpoint['region'] == obj_storage_config.region]
-
-        self.storage_url = swift_endpoint[0]['publicURL']
-        self.auth_token = r.json()['access']['token']['id']
-
-        self.config = ObjectStorageAPIConfig(
-            config_file_path=config_file_path,
-            section_name=ObjectStorageAPIConfig.SECTION_NAME)
-
-        self.client = ObjectStorageAPIClient(self.storage_url, self.auth_token)
-
-        self.behaviors = ObjectStorageAPI_Behaviors(
-            client=self.client,
-            config=self.config)
+    _session = None
+    _session_lock = threading.Lock()
+
+    def __init__(self, config_file_path=None):
+        self._config_file_path = config_file_path
+        self._lock = threading.RLock()
+        self._config = None
+        self._storage_url = None
+        self._auth_token = None
+        self._client = None
+        self._behaviors = None
+        self._waiters = None
+
+    @classmethod
+    def session(cls):
+        """
+        Returns the composite shared by the test session, creating it on
+        first use.
+        """
+        with cls._session_lock:
+            if cls._session is None:
+                cls._session = cls()
+            return cls._session
+
+    @classmethod
+    def reset_session(cls):
+        """
+        Drops the shared composite, the next call to session() creates a new
+        one.
+        """
+        with cls._session_lock:
+            cls._session = None
+
+    @property
+    def config_file_path(self):
+        return self._config_file_path or os.environ['TEST_CONFIG']
+
+    @property
+    def config(self):
+        with self._lock:
+            if self._config is None:
+                self._config = ObjectStorageAPIConfig(
+                    config_file_path=self.config_file_path,
+                    section_name=ObjectStorageAPIConfig.SECTION_NAME)
+            return self._config
+
+    @property
+    def storage_url(self):
+        self._authenticate()
+        return self._storage_url
+
+    @property
+    def auth_token(self):
+        self._authenticate()
+        return self._auth_token
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = ObjectStorageAPIClient(
+                    self.storage_url,
+                    self.auth_token,
+                    pool_connections=self.config.http_pool_connections,
+                    pool_maxsize=self.config.http_pool_maxsize,
+                    keep_alive=self.config.http_keep_alive,
+                    batch_concurrency=self.config.batch_concurrency,
+                    deserialize_responses=self.config.deserialize_responses)
+                if self.config.request_timing_file:
+                    self._client.add_request_hook(RequestTimingFileExporter(
+                        self.config.request_timing_file))
+            return self._client
+
+    @property
+    def behaviors(self):
+        with self._lock:
+            if self._behaviors is None:
+                self._behaviors = ObjectStorageAPI_Behaviors(
+                    client=self.client,
+                    config=self.config)
+            return self._behaviors
+
+    @property
+    def waiters(self):
+        with self._lock:
+            if self._waiters is None:
+                self._waiters = ObjectStorageWaiters(
+                    client=self.client,
+                    config=self.config)
+            return self._waiters
+
+    def _authenticate(self):
+        with self._lock:
+            if self._auth_token is not None:
+                return
+
+            config_file_path = self.config_file_path
+            user_auth_config = UserAuthConfig(
+                config_file_path=config_file_path,
+                section_name=UserAuthConfig.SECTION_NAME)
+
+            user_config = UserConfig(
+                config_file_path=config_file_path,
+                section_name=UserConfig.SECTION_NAME)
+
+            obj_storage_config = ObjectStorageConfig(
+                config_file_path=config_file_path)
+            os_service_name = obj_storage_config.identity_service_name
+
+            token_cache = AuthTokenCache(
+                cache_file_path=user_auth_config.token_cache_file,
+                expiry_margin=user_auth_config.token_expiry_margin)
+
+            access = token_cache.get_access(
+                AuthTokenCache.key(
+                    user_auth_config.auth_endpoint,
+                    user_config.username,
+                    obj_storage_config.region),
+                lambda: authenticate(
+                    url=user_auth_config.auth_endpoint,
+                    username=user_config.username,
+                    api_key=user_config.api_key))
+
+            services = access['serviceCatalog']
+
+            swift_service = [service for service in services
+                             if service['name'] == os_service_name]
+
+            swift_service = swift_service[0]
+
+            swift_endpoint = [
+                endpoint for endpoint in swift_service['endpoints']
+                if endpoint['region'] == obj_storage_config.region]
+
+            self._storage_url = swift_endpoint[0]['publicURL']
+            self._auth_token = access['token']['id']
@@ -1,4 +1,5 @@
-from snappy.common.data_interfaces import ConfigSectionInterface
+from snappy.common.data_interfaces import (
+    ConfigSectionInterface, config_property)
 
 
 class ObjectStorageConfig(ConfigSectionInterface):
@@ -8,14 +9,14 @@ class ObjectStorageConfig(ConfigSectionInterface):
 
     SECTION_NAME = 'objectstorage'
 
-    @property
+    @config_property
     def identity_service_name(self):
         """
         Service name to use.
         """
         return self.get('identity_service_name')
 
-    @property
+    @config_property
     def region(self):
         """
         Region to use.
@@ -33,7 +34,7 @@ class ObjectStorageAPIConfig(ConfigSectionInterface):
     ALL_FEATURES = '__ALL__'
     NO_FEATURES = '__NONE__'
 
-    @property
+    @config_property
     def base_container_name(self):
         """
         String to be prepended to created container names.
@@ -42,7 +43,7 @@ class ObjectStorageAPIConfig(ConfigSectionInterface):
         """
         return self.get('base_container_name', '')
 
-    @property
+    @config_property
     def object_expirer_run_interval(self):
         """
         Interval in seconds that the object expirer is expected to run
@@ -50,7 +51,7 @@ class ObjectStorageAPIConfig(ConfigSectionInterface):
         """
         return int(self.get('object_expirer_run_interval', '60'))
 
-    @property
+    @config_property
     def use_swift_info(self):
         """
         If True, tells CloudCafe to make a call to swift's /info resource
@@ -59,7 +60,24 @@ class ObjectStorageAPIConfig(ConfigSectionInterface):
         """
         return self.get_boolean('use_swift_info', True)
 
-    @property
+    @config_property
+    def swift_info_cache_file(self):
+        """
+        File to share the response from swift's /info resource between
+        test runs and processes.  By default /info is requested once per
+        process and not written to disk.
+        """
+        return self.get('swift_info_cache_file', '')
+
+    @config_property
+    def swift_info_cache_ttl(self):
+        """
+        Seconds a /info response in swift_info_cache_file is used for before
+        it is requested again.
+        """
+        return int(self.get('swift_info_cache_ttl', '300'))
+
+    @config_property
     def version(self):
         """
         Specify the version of swift running allowing tests tagged with the
@@ -69,7 +87,7 @@ class ObjectStorageAPIConfig(ConfigSectionInterface):
         """
         return self.get('version', '')
 
-    @property
+    @config_property
     def features(self):
         """
         Tests can be tagged with a decorator as follows:
@@ -90,7 +108,7 @@ class ObjectStorageAPIConfig(ConfigSectionInterface):
         """
         return self.get('features', '')
 
-    @property
+    @config_property
     def excluded_features(self):
         """
         In addition to setting the features, you can also exclude features from
@@ -104,14 +122,14 @@ class ObjectStorageAPIConfig(ConfigSectionInterface):
         """
         return self.get('excluded_features', '')
 
-    @property
+    @config_property
     def max_container_name_len(self):
         """
         Max container name length in bytes.
         """
         return int(self.get('max_container_name_len', 256))
 
-    @property
+    @config_property
     def containers_listing_default_count(self):
         """
         Default object count returned for a container listing.
@@ -119,35 +137,35 @@ class ObjectStorageAPIConfig(ConfigSectionInterface):
         return int(self.get('containers_list_default_count',
                             self.container_listin_limit))
 
-    @property
+    @config_property
     def container_listing_limit(self):
         """
         Max object count for a container listing.
         """
         return int(self.get('container_listing_limit', 10000))
 
-    @property
+    @config_property
     def max_object_name_len(self):
         """
         Maximum length in bytes for a object name.
         """
         return int(self.get('max_object_name_len', 1024))
 
-    @property
+    @config_property
     def max_object_size(self):
         """
         Maximum object size in bytes.
         """
         return int(self.get('max_object_size', 5368709122))
 
-    @property
+    @config_property
     def object_metadata_max_count(self):
         """
         Maximum number of distinct metadata items.
         """
         return int(self.get('object_metadata_max_count', 90))
 
-    @property
+    @config_property
     def max_metadata_overall_size(self):
         """
         Maximum number of bytes allowed for combined container/object
@@ -155,14 +173,14 @@ class ObjectStorageAPIConfig(ConfigSectionInterface):
         """
         return int(self.get('max_metadata_overall_size', 4096))
 
-    @property
+    @config_property
     def account_listing_limit(self):
         """
         Max container list length of a account listing.
         """
         return self.get('object_list_default_count')
 
-    @property
+    @config_property
     def metadata_name_max_len(self):
         """
         Maximum length in bytes allowed for metadata names.
@@ -171,28 +189,28 @@ class ObjectStorageAPIConfig(ConfigSectionInterface):
         """
         return int(self.get('metadata_name_max_len', 128))
 
-    @property
+    @config_property
     def metadata_value_max_len(self):
         """
         Maximum length in bytes allowed for metadata values.
         """
         return int(self.get('metadata_value_max_len', 256))
 
-    @property
+    @config_property
     def tempurl_key_cache_time(self):
         """
         The amount of time that keys for tempurl are cached.
         """
         return int(self.get('tempurl_key_cache_time', 0))
 
-    @property
+    @config_property
     def formpost_key_cache_time(self):
         """
         The amount of time that keys for formpost are cached.
         """
         return int(self.get('formpost_key_cache_time', 0))
 
-    @property
+    @config_property
     def min_slo_segment_size(self):
         """
         The smallest size in bytes of a non-terminal static large object
@@ -200,7 +218,15 @@ class ObjectStorageAPIConfig(ConfigSectionInterface):
         """
         return int(self.get('min_slo_segment_size', 1048576))
 
-    @property
+    @config_property
+    def segment_upload_concurrency(self):
+        """
+        Max number of segments uploaded at once when generating static and
+        dynamic large objects.
+        """
+        return int(self.get('segment_upload_concurrency', '10'))
+
+    @config_property
     def list_timeout(self):
         """
         The timeout in seconds to stop retrying container/object listings
@@ -208,14 +234,14 @@ class ObjectStorageAPIConfig(ConfigSectionInterface):
         """
         return int(self.get('list_timeout', 120))
 
-    @property
+    @config_property
     def info_admin_key(self):
         """
         The admin key for admin /info calls.
         """
         return self.get('info_admin_key', '')
 
-    @property
+    @config_property
     def strict_cors_mode(self):
         """
         If set to False, CORS will opperate in the 'old' way, otherwise
@@ -223,37 +249,48 @@ class ObjectStorageAPIConfig(ConfigSectionInterface):
         """
         return self.get_boolean('strict_cors_mode', True)
 
-    @property
+    @config_property
     def bulk_delete_max_count(self):
         """
         The max number of objects bulk delete can delete.
         """
         return int(self.get('bulk_delete_max_count', 1000))
 
-    @property
+    @config_property
     def object_deletion_wait_interval(self):
         """
         Interval in seconds to wait for x_delete_at
         """
         return int(self.get('object_deletion_wait_interval', '70'))
 
-    @property
+    @config_property
     def max_retry_count(self):
         """
-        The maximum number of retries the retry_until_success method will
-        run.
+        The number of retry_sleep_time sleeps the retry_until_success
+        method retries for, i.e. it stops once max_retry_count *
+        retry_sleep_time seconds have passed.
         """
         return int(self.get('max_retry_count', '5'))
 
-    @property
+    @config_property
     def retry_sleep_time(self):
         """
-        The amount of time, in seconds, that the retry_until_success method
-        will wait between retries.
+        The longest amount of time, in seconds, that the retry_until_success
+        method will wait between retries.  It retries for up to
+        max_retry_count * retry_sleep_time seconds in total.
         """
         return int(self.get('retry_sleep_time', '5'))
 
-    @property
+    @config_property
+    def retry_initial_sleep_time(self):
+        """
+        The amount of time, in seconds, that the retry_until_success method
+        waits before its first retry.  Each wait after that is twice as
+        long, up to retry_sleep_time.
+        """
+        return float(self.get('retry_initial_sleep_time', '0.1'))
+
+    @config_property
     def cleanup_failure_container_name(self):
         """
         The container name that will store clean up failure logs.
@@ -261,12 +298,60 @@ class ObjectStorageAPIConfig(ConfigSectionInterface):
         return self.get('cleanup_failure_container_name',
                         'test_cleanup_failures')
 
+    @config_property
+    def http_pool_connections(self):
+        """
+        The number of per host connection pools the client's HTTP session
+        will keep.
+        """
+        return int(self.get('http_pool_connections', '10'))
+
+    @config_property
+    def http_pool_maxsize(self):
+        """
+        The maximum number of connections the client's HTTP session will keep
+        open to a single host.
+        """
+        return int(self.get('http_pool_maxsize', '10'))
+
+    @config_property
+    def http_keep_alive(self):
+        """
+        If True, connections to the proxy are kept alive and reused between
+        requests.  If False, every request closes its connection.
+        """
+        return self.get_boolean('http_keep_alive', True)
+
+    @config_property
+    def batch_concurrency(self):
+        """
+        The number of requests the client's batch methods run at once.
+        """
+        return int(self.get('batch_concurrency', '10'))
+
+    @config_property
+    def deserialize_responses(self):
+        """
+        If False, the client never builds response.entity for listings,
+        which saves the CPU spent on models nobody reads when generating
+        load.  Streamed listings, such as iter_objects, are still parsed.
+        """
+        return self.get_boolean('deserialize_responses', True)
+
+    @config_property
+    def request_timing_file(self):
+        """
+        If set, the timing of every request made by the client is appended
+        to this file as a line of JSON.  See swift_instrumentation.
+        """
+        return self.get('request_timing_file', '')
+
 
 class UserAuthConfig(ConfigSectionInterface):
 
     SECTION_NAME = 'user_auth_config'
 
-    @property
+    @config_property
     def auth_endpoint(self):
         """The authentication endpoint to use for the credentials in the
         [user] config section.  This value is used by the auth provider.
@@ -274,7 +359,7 @@ class UserAuthConfig(ConfigSectionInterface):
 
         return self.get("endpoint")
 
-    @property
+    @config_property
     def strategy(self):
         """The type of authentication exposed by the auth_endpoint. Currently,
         supported values are 'keystone', 'rax_auth', 'rax_auth_mfa', or
@@ -282,47 +367,64 @@ class UserAuthConfig(ConfigSectionInterface):
         """
         return self.get("strategy")
 
+    @config_property
+    def token_cache_file(self):
+        """File that auth tokens are cached in, so that they can be shared
+        by parallel test processes until they are about to expire.  The file
+        holds live tokens, so it is created readable only by its owner and
+        is best kept in a directory of the user's own.  Tokens are only
+        cached in memory unless this is set.
+        """
+        return self.get("token_cache_file", "")
+
+    @config_property
+    def token_expiry_margin(self):
+        """Number of seconds before a cached token expires at which it is
+        replaced by a new one.
+        """
+        return int(self.get("token_expiry_margin", "300"))
+
 
 class UserConfig(ConfigSectionInterface):
 
     SECTION_NAME = 'user'
 
-    @property
+    @config_property
     def username(self):
         """The name of the user, if applicable"""
         return self.get("username")
 
-    @property
+    @config_property
     def api_key(self):
         """The user's api key, if applicable"""
         return self.get_raw("api_key")
 
-    @property
+    @config_property
     def password(self):
         """The user's password, if applicable"""
         return self.get_raw("password")
 
-    @property
+    @config_property
     def tenant_id(self):
         """The user's tenant_id, if applicable"""
         return self.get("tenant_id")
 
-    @property
+    @config_property
     def tenant_name(self):
         """The user's tenant_name, if applicable"""
         return self.get("tenant_name")
 
-    @property
+    @config_property
     def user_id(self):
         """The users's user_id, if applicable"""
         return self.get("user_id")
 
-    @property
+    @config_property
     def project_id(self):
         """The users's project_id, if applicable"""
         return self.get("project_id")
 
-    @property
+    @config_property
     def passcode(self):
         """The auth MFA's secondary password/passcode"""
         return self.get("passcode", 'MFA_PASSCODE_NOT_SET')
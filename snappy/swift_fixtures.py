@@ -1,4 +1,6 @@
 import unittest
+from functools import wraps
+
 from snappy.swift_composite import ObjectStorageComposite
 
 
@@ -26,7 +28,8 @@ class ObjectStorageFixture(unittest.TestCase):
         match the required version provided.  If unable to retrieve the
         version, the default behavior will be to run the test.
         Configuration of what version swift is running can be done from the
-        objectstorage config file.
+        objectstorage config file.  The version is looked up when the test
+        runs, not when it is decorated.
 
         Note: "lambda func: func" is from the Python unit tests example
               "25.3.6. Skipping tests and expected failures":
@@ -52,51 +55,62 @@ class ObjectStorageFixture(unittest.TestCase):
         """
 
         def decorator(func):
-            # TODO: This is not ideal, should change this to support
-            # multiple versions
-            required_version = required_versions[0]
-            objectstorage_api_config = ObjectStorageComposite().config
-            behaviors = ObjectStorageComposite().behaviors
-
-            swift_version = objectstorage_api_config.version
-            if not swift_version and objectstorage_api_config.use_swift_info:
-                info = behaviors.get_swift_info()
-                swift_version = info.get(
-                    'swift', {'version': None}).get('version', None)
-
-            if not swift_version:
-                return func
-
-            if required_version.startswith('<'):
-                required_version = required_version.lstrip('<')
-                compare_func = lambda sv, tv: sv < tv
-                extra_message = ' less than'
-            elif required_version.startswith('>'):
-                required_version = required_version.lstrip('>')
-                compare_func = lambda sv, tv: sv > tv
-                extra_message = ' greater than'
-            else:
-                required_version = required_version.lstrip('=')
-                compare_func = lambda sv, tv: sv.startswith(tv)
-                extra_message = ''
-
-            if compare_func(swift_version, required_version):
-                func
-
-            setattr(func, '__unittest_skip__', True)
-            setattr(
-                func, '__unittest_skip_why__',
-                'swift running version {0}, requires version{1}: {2}'.format(
-                    swift_version, extra_message, required_version))
-            return func
+            @wraps(func)
+            def wrapper(self, *args, **kwargs):
+                reason = cls._check_required_version(required_versions)
+                if reason:
+                    self.skipTest(reason)
+                return func(self, *args, **kwargs)
+            return wrapper
         return decorator
 
+    @staticmethod
+    def _check_required_version(required_versions):
+        """
+        Returns the reason to skip a test tagged with required_version, or
+        None if the test should run.
+        """
+        # TODO: This is not ideal, should change this to support
+        # multiple versions
+        required_version = required_versions[0]
+        object_storage_api = ObjectStorageComposite.session()
+        objectstorage_api_config = object_storage_api.config
+
+        swift_version = objectstorage_api_config.version
+        if not swift_version and objectstorage_api_config.use_swift_info:
+            info = object_storage_api.behaviors.get_swift_info()
+            swift_version = info.get(
+                'swift', {'version': None}).get('version', None)
+
+        if not swift_version:
+            return None
+
+        if required_version.startswith('<'):
+            required_version = required_version.lstrip('<')
+            compare_func = lambda sv, tv: sv < tv
+            extra_message = ' less than'
+        elif required_version.startswith('>'):
+            required_version = required_version.lstrip('>')
+            compare_func = lambda sv, tv: sv > tv
+            extra_message = ' greater than'
+        else:
+            required_version = required_version.lstrip('=')
+            compare_func = lambda sv, tv: sv.startswith(tv)
+            extra_message = ''
+
+        if compare_func(swift_version, required_version):
+            return None
+
+        return 'swift running version {0}, requires version{1}: {2}'.format(
+            swift_version, extra_message, required_version)
+
     @classmethod
     def required_features(cls, *required_features):
         """
         Test decorator to skip tests if features are not configured in swift.
         Configuration of what features are enabled can be done from the
-        objectstorage config file.
+        objectstorage config file.  Features are resolved when the test
+        runs, so importing a module of decorated tests makes no requests.
 
         Note: "lambda func: func" is from the Python unit tests example
               "25.3.6. Skipping tests and expected failures":
@@ -110,39 +124,40 @@ class ObjectStorageFixture(unittest.TestCase):
         """
 
         def decorator(func):
-            objectstorage_api_config = ObjectStorageComposite().config
-            behaviors = ObjectStorageComposite().behaviors
-
-            features = behaviors.get_configured_features()
+            @wraps(func)
+            def wrapper(self, *args, **kwargs):
+                reason = cls._check_required_features(required_features)
+                if reason:
+                    self.skipTest(reason)
+                return func(self, *args, **kwargs)
+            return wrapper
+        return decorator
 
-            if features == objectstorage_api_config.ALL_FEATURES:
-                return func
+    @staticmethod
+    def _check_required_features(required_features):
+        """
+        Returns the reason to skip a test tagged with required_features, or
+        None if the test should run.
+        """
+        object_storage_api = ObjectStorageComposite.session()
+        objectstorage_api_config = object_storage_api.config
+        behaviors = object_storage_api.behaviors
 
-            if features == objectstorage_api_config.NO_FEATURES:
-                setattr(func, '__unittest_skip__', True)
-                setattr(func, '__unittest_skip_why__', 'Skipping All Features')
+        features = behaviors.get_configured_feature_set()
 
-            features = features.split()
-            missing_reqs = False
-            for req in required_features:
-                if req not in features:
-                    missing_reqs = True
-                    break
+        if features == objectstorage_api_config.NO_FEATURES:
+            return 'Skipping All Features'
 
-            if missing_reqs:
-                setattr(func, '__unittest_skip__', True)
-                setattr(
-                    func, '__unittest_skip_why__',
-                    'requires features: {0}'.format(
-                        ', '.join(required_features)))
+        if not behaviors.has_features(*required_features):
+            return 'requires features: {0}'.format(
+                ', '.join(required_features))
 
-            return func
-        return decorator
+        return None
 
     @classmethod
     def setUpClass(cls):
         super(ObjectStorageFixture, cls).setUpClass()
-        object_storage_api = ObjectStorageComposite()
+        object_storage_api = ObjectStorageComposite.session()
 
         cls.objectstorage_api_config = object_storage_api.config
         cls.storage_url = object_storage_api.storage_url
@@ -151,6 +166,7 @@ class ObjectStorageFixture(unittest.TestCase):
             cls.objectstorage_api_config.base_container_name)
         cls.client = object_storage_api.client
         cls.behaviors = object_storage_api.behaviors
+        cls.waiters = object_storage_api.waiters
 
     def create_temp_container(self, descriptor='', headers=None):
         """
@@ -1,9 +1,13 @@
 import json
 import math
-from random import choice
+import sys
+import unittest
+from uuid import uuid4
 
 from hashlib import md5
+from snappy.tools.payload import PayloadGenerator, VirtualPayload
 from snappy.tools.unicode_helpers import (UNICODE_BLOCKS, BLOCK_NAMES)
+from snappy.tools.worker_pool import WorkerPool, run_concurrently
 from snappy.common.datasets import DatasetList
 from swift_composite import ObjectStorageComposite
 from swift_config import ObjectStorageAPIConfig
@@ -13,46 +17,79 @@ CONTENT_TYPES = {
     'text': 'text/plain; charset=UTF-8'
 }
 
+OBJECT_TYPES = ['standard', 'dlo', 'slo']
+
+# Swift features that have to be available to create each object type.
+OBJECT_TYPE_FEATURES = {
+    'dlo': 'dlo',
+    'slo': 'slo'
+}
+
+OBJECT_TYPE_GENERATORS = {
+    'standard': 'generate_object',
+    'dlo': 'generate_dynamic_large_object',
+    'slo': 'generate_static_large_object'
+}
+
 
 class ObjectDatasetList(DatasetList):
     """
     Handles creation of differing types of objects for use with data driven
     tests.
+
+    A dataset is added for every object type that isn't excluded.  Whether
+    the features needed by dlo and slo objects are available is only
+    checked when generate_object is called, and tests using an unavailable
+    type are skipped then, so that building the list makes no requests.
     """
 
     def __init__(self, exclude=None):
-        object_storage_api = ObjectStorageComposite()
+        if exclude is None:
+            exclude = []
 
-        api_config = object_storage_api.config
-        client = object_storage_api.client
-        behaviors = object_storage_api.behaviors
-        features = behaviors.get_configured_features()
+        for object_type in OBJECT_TYPES:
+            if object_type in exclude:
+                continue
+            self.append_new_dataset(
+                object_type,
+                {'object_type': object_type,
+                 'generate_object': LazyObjectGenerator(object_type)})
 
-        if features == api_config.ALL_FEATURES:
-            features = ['dlo', 'slo']
 
-        generator = ObjectStorageGenerator(client)
+class LazyObjectGenerator(object):
+    """
+    Callable standing in for one of ObjectStorageGenerator's generate
+    methods.  The session composite and the generator are only created on
+    the first call.
+    """
 
-        if exclude is None:
-            exclude = []
+    def __init__(self, object_type):
+        self.object_type = object_type
+        self._generate = None
 
-        if 'standard' not in exclude:
-            self.append_new_dataset(
-                'standard',
-                {'object_type': 'standard',
-                 'generate_object': generator.generate_object})
+    def _get_generate_func(self):
+        if self._generate is None:
+            object_storage_api = ObjectStorageComposite.session()
+            api_config = object_storage_api.config
 
-        if 'dlo' in features and 'dlo' not in exclude:
-            self.append_new_dataset(
-                'dlo',
-                {'object_type': 'dlo',
-                 'generate_object': generator.generate_dynamic_large_object})
+            required_feature = OBJECT_TYPE_FEATURES.get(self.object_type)
+            if required_feature:
+                behaviors = object_storage_api.behaviors
+                if not behaviors.has_features(required_feature):
+                    raise unittest.SkipTest(
+                        'requires features: {0}'.format(required_feature))
 
-        if 'slo' in features and 'slo' not in exclude:
-            self.append_new_dataset(
-                'slo',
-                {'object_type': 'slo',
-                 'generate_object': generator.generate_static_large_object})
+            generator = ObjectStorageGenerator(
+                object_storage_api.client, api_config=api_config)
+            self._generate = getattr(
+                generator, OBJECT_TYPE_GENERATORS[self.object_type])
+        return self._generate
+
+    def __call__(self, *args, **kwargs):
+        return self._get_generate_func()(*args, **kwargs)
+
+    def __repr__(self):
+        return '<LazyObjectGenerator {0}>'.format(self.object_type)
 
 
 class ObjectStorageGenerator(object):
@@ -60,9 +97,19 @@ class ObjectStorageGenerator(object):
     Generates objects for testing.
     """
 
-    def __init__(self, client):
+    def __init__(self, client, api_config=None,
+                 segment_upload_concurrency=None):
+        """
+        @param segment_upload_concurrency: max number of large object
+                                           segments uploaded at once.
+                                           Defaults to the config value.
+        @type segment_upload_concurrency: int
+        """
         self.client = client
-        self.api_config = ObjectStorageAPIConfig()
+        self.api_config = api_config or ObjectStorageAPIConfig()
+        self.segment_upload_concurrency = (
+            segment_upload_concurrency or
+            self.api_config.segment_upload_concurrency)
 
     def _get_default_data_pool(self):
         """
@@ -74,6 +121,124 @@ class ObjectStorageGenerator(object):
         return [x for x in UNICODE_BLOCKS.get_range(
             BLOCK_NAMES.basic_latin).encoded_codepoints()]
 
+    def _get_segments(self, data_size, segment_size):
+        """
+        Splits an object into segments.
+
+        @return: (segment number, start offset, size) of each segment
+        @rtype: list of tuples
+        """
+        num_segments = int(math.ceil(data_size / float(segment_size)))
+        segments = []
+        for segment_id in xrange(num_segments):
+            segment_start = segment_id * segment_size
+            segments.append((
+                segment_id,
+                segment_start,
+                min(segment_size, data_size - segment_start)))
+        return segments
+
+    def _create_segments(self, container_name, segments, data=None,
+                         data_pool=None, data_op=None):
+        """
+        Creates the segments of a large object, uploading up to
+        segment_upload_concurrency of them at once.
+
+        Segment data is generated, hashed and passed to data_op in segment
+        order as segments are queued for upload, so the object's md5 and
+        etag are built up incrementally and only the segments waiting for or
+        being uploaded are held in memory.  If any segment fails to upload,
+        the segments that were created are deleted before raising.
+
+        @param segments: (segment name, start offset, size) of each segment,
+                         in order.
+        @type segments: list of tuples
+
+        @return: the extra data and etag of each segment, in order, and the
+                 md5 and etag of the whole object.
+        @rtype: tuple
+        """
+        payload_generator = PayloadGenerator(data_pool)
+        data_md5 = md5()
+        data_etag = md5()
+        segments_extra_data = []
+        segment_etags = []
+        uploads = []
+
+        pool = WorkerPool(self.segment_upload_concurrency)
+        try:
+            for segment_name, segment_start, segment_size in segments:
+                if data:
+                    segment_data = data[
+                        segment_start:segment_start + segment_size]
+                else:
+                    segment_data = payload_generator.generate(segment_size)
+
+                segment_md5 = md5(segment_data).hexdigest()
+                segment_extra_data = {'name': segment_name,
+                                      'size': segment_size,
+                                      'md5': segment_md5}
+                if data_op:
+                    (segment_data, segment_extra_data) = data_op(
+                        segment_data, segment_extra_data)
+
+                segment_etag = md5(segment_data).hexdigest()
+                data_md5.update(segment_data)
+                data_etag.update(segment_etag)
+
+                upload = pool.submit(
+                    self.client.create_object,
+                    container_name,
+                    segment_name,
+                    data=segment_data)
+                # Don't keep the segment data around once it is uploaded.
+                upload.item = segment_name
+                uploads.append(upload)
+                segments_extra_data.append(segment_extra_data)
+                segment_etags.append(segment_etag)
+        except Exception:
+            exc_info = sys.exc_info()
+            pool.close()
+            self._delete_objects(
+                container_name, self._get_created_names(uploads))
+            raise exc_info[0], exc_info[1], exc_info[2]
+        pool.close()
+
+        for upload in uploads:
+            if upload.error is not None or not upload.result.ok:
+                self._delete_objects(
+                    container_name, self._get_created_names(uploads))
+                if upload.error is not None:
+                    upload.get()
+                raise Exception(
+                    'Failed to create segment {0}/{1}: {2}'.format(
+                        container_name,
+                        upload.item,
+                        upload.result.status_code))
+
+        for segment_extra_data, upload in zip(segments_extra_data, uploads):
+            segment_extra_data['response'] = upload.result
+
+        return (segments_extra_data, segment_etags,
+                data_md5.hexdigest(), data_etag.hexdigest())
+
+    @staticmethod
+    def _get_created_names(uploads):
+        """
+        Returns the names of the objects whose uploads succeeded.
+        """
+        return [upload.item for upload in uploads
+                if upload.ok and upload.result.ok]
+
+    def _delete_objects(self, container_name, object_names):
+        """
+        Deletes objects created before a failure, ignoring any errors.
+        """
+        run_concurrently(
+            self.client.delete_object,
+            [(container_name, object_name) for object_name in object_names],
+            self.segment_upload_concurrency, unpack=True)
+
     def generate_object(self, container_name, object_name,
                         data=None, data_size=None, data_pool=None,
                         data_op=None, headers=None, params=None):
@@ -85,7 +250,9 @@ class ObjectStorageGenerator(object):
         @param object_name: name of object to be created
         @type object_name: string
         @param data: use this instead of generating data for the object.
-        @type data: string
+                     A VirtualPayload is streamed instead of being read into
+                     memory.
+        @type data: string or VirtualPayload
         @param data_size: size of object to be created
         @type data_size: int
         @param data_pool: characters to use in generating object content
@@ -117,12 +284,14 @@ class ObjectStorageGenerator(object):
             data_pool = self._get_default_data_pool()
 
         if not data:
-            data = ''.join(
-                [choice(data_pool) for x in xrange(data_size)])
+            data = PayloadGenerator(data_pool).generate(data_size)
         extra_data = {}
         if data_op:
             (data, extra_data) = data_op(data, extra_data)
-        data_md5 = md5(data).hexdigest()
+        if isinstance(data, VirtualPayload):
+            data_md5 = data.md5
+        else:
+            data_md5 = md5(data).hexdigest()
         data_etag = data_md5
 
         default_headers = {'Content-Length': str(len(data)),
@@ -195,42 +364,17 @@ class ObjectStorageGenerator(object):
         elif not segment_size:
             segment_size = 100
 
-        num_segments = int(math.ceil(data_size / float(segment_size)))
+        segments = [
+            ('segment.{0}.{1}'.format(object_name, segment_id),
+             segment_start, size)
+            for segment_id, segment_start, size in self._get_segments(
+                data_size, segment_size)]
 
-        data_md5 = md5()
-        data_etag = md5()
-        extra_data = {'segments': []}
-        for segment_id in [x for x in xrange(num_segments)]:
-            segment_start = segment_id * segment_size
-            if segment_id + 1 == num_segments:
-                segment_size = data_size % segment_size
-            segment_end = segment_start + segment_size
-            segment_name = 'segment.{0}.{1}'.format(object_name, segment_id)
-            if data:
-                segment_data = data[segment_start:segment_end]
-            else:
-                segment_data = ''.join([choice(data_pool) for x in xrange(
-                    segment_size)])
-
-            segment_md5 = md5(segment_data).hexdigest()
-            segment_extra_data = {'name': segment_name,
-                                  'size': segment_size,
-                                  'md5': segment_md5}
-            if data_op:
-                (segment_data, segment_extra_data) = data_op(
-                    segment_data, segment_extra_data)
-
-            segment_etag = md5(segment_data)
-            segment_etag = segment_etag.hexdigest()
-            data_md5.update(segment_data)
-            data_etag.update(segment_etag)
-
-            segment_response = self.client.create_object(
-                container_name,
-                segment_name,
-                data=segment_data)
-            segment_extra_data['response'] = segment_response
-            extra_data['segments'].append(segment_extra_data)
+        (segments_extra_data, _, data_md5, data_etag) = \
+            self._create_segments(
+                container_name, segments, data=data, data_pool=data_pool,
+                data_op=data_op)
+        extra_data = {'segments': segments_extra_data}
 
         default_headers = {'X-Object-Manifest': '{0}/segment.{1}'.format(
             container_name, object_name)}
@@ -247,8 +391,8 @@ class ObjectStorageGenerator(object):
             object_name,
             headers=all_headers)
 
-        return {'md5': data_md5.hexdigest(),
-                'etag': data_etag.hexdigest(),
+        return {'md5': data_md5,
+                'etag': data_etag,
                 'size': data_size,
                 'type': 'dlo',
                 'response': response,
@@ -304,48 +448,22 @@ class ObjectStorageGenerator(object):
         elif not segment_size:
             segment_size = self.api_config.min_slo_segment_size
 
-        num_segments = int(math.ceil(data_size / float(segment_size)))
+        segments = [
+            ('{0}.{1}'.format(object_name, segment_id), segment_start, size)
+            for segment_id, segment_start, size in self._get_segments(
+                data_size, segment_size)]
 
-        manifest = []
+        (segments_extra_data, segment_etags, data_md5, data_etag) = \
+            self._create_segments(
+                container_name, segments, data=data, data_pool=data_pool,
+                data_op=data_op)
+        extra_data = {'segments': segments_extra_data}
 
-        data_md5 = md5()
-        data_etag = md5()
-        extra_data = {'segments': []}
-        for segment_id in [x for x in xrange(num_segments)]:
-            segment_start = segment_id * segment_size
-            if segment_id + 1 == num_segments:
-                segment_size = data_size % segment_size
-            segment_end = segment_start + segment_size
-            segment_name = '{0}.{1}'.format(object_name, segment_id)
-            segment_path = '/{0}/{1}'.format(container_name, segment_name)
-
-            if data:
-                segment_data = data[segment_start:segment_end]
-            else:
-                segment_data = ''.join([choice(data_pool) for x in xrange(
-                    segment_size)])
-            segment_md5 = md5(segment_data).hexdigest()
-            segment_extra_data = {'name': segment_name,
-                                  'size': segment_size,
-                                  'md5': segment_md5}
-            if data_op:
-                (segment_data, segment_extra_data) = data_op(
-                    segment_data, segment_extra_data)
-
-            segment_etag = md5(segment_data)
-            segment_etag = segment_etag.hexdigest()
-            data_md5.update(segment_data)
-            data_etag.update(segment_etag)
-
-            segment_response = self.client.create_object(
-                container_name,
-                segment_name,
-                data=segment_data)
-            segment_extra_data['response'] = segment_response
-            extra_data['segments'].append(segment_extra_data)
-
-            manifest.append({'path': segment_path, 'etag': segment_etag,
-                             'size_bytes': segment_size})
+        manifest = [
+            {'path': '/{0}/{1}'.format(container_name, name),
+             'etag': etag,
+             'size_bytes': size}
+            for (name, _, size), etag in zip(segments, segment_etags)]
 
         response = self.client.create_object(
             container_name,
@@ -353,8 +471,201 @@ class ObjectStorageGenerator(object):
             data=json.dumps(manifest),
             params={'multipart-manifest': 'put'}, headers=headers)
 
-        return {'md5': data_md5.hexdigest(),
-                'etag': data_etag.hexdigest(),
+        return {'md5': data_md5,
+                'etag': data_etag,
                 'size': data_size,
                 'response': response,
                 'extra': extra_data}
+
+    def _create_nested_slo_leaf(self, container_name, segment_name, payload,
+                                segment_start, segment_size, segment_etags):
+        segment_data = payload.slice(
+            segment_start, segment_start + segment_size)
+        segment_etags[segment_name] = md5(segment_data).hexdigest()
+        return self.client.create_object(
+            container_name, segment_name, data=segment_data)
+
+    def _create_nested_slo_manifest(self, container_name, manifest_name,
+                                    manifest, headers=None):
+        return self.client.create_object(
+            container_name,
+            manifest_name,
+            data=json.dumps(manifest),
+            params={'multipart-manifest': 'put'}, headers=headers)
+
+    def _create_nested_slo_level(self, container_name, func, items,
+                                 created_names):
+        """
+        Runs func on every item concurrently, adding the names of the
+        objects created to created_names.  Raises if any of them failed.
+
+        @return: the response for each item, in order.
+        @rtype: list
+        """
+        uploads = run_concurrently(
+            func,
+            [(container_name,) + tuple(item) for item in items],
+            self.segment_upload_concurrency, unpack=True)
+        for upload in uploads:
+            upload.item = upload.item[1]
+        created_names.extend(self._get_created_names(uploads))
+
+        for upload in uploads:
+            if upload.error is not None:
+                upload.get()
+            if not upload.result.ok:
+                raise Exception(
+                    'Failed to create nested SLO object {0}/{1}: {2}'.format(
+                        container_name,
+                        upload.item,
+                        upload.result.status_code))
+        return [upload.result for upload in uploads]
+
+    def generate_nested_static_large_object(self, container_name,
+                                            object_name, depth=2,
+                                            fan_out=3, segment_sizes=None,
+                                            seed=None, data_pool=None,
+                                            headers=None):
+        """
+        Generate a static large object nested depth levels deep: the
+        object's manifest lists fan_out SLOs, each of whose manifests list
+        fan_out SLOs and so on, down to SLOs made of plain segments.
+
+        The tree is built bottom up.  All of the segments are uploaded
+        concurrently, then all of the manifests of each level, using up to
+        segment_upload_concurrency requests at once.
+
+        The object's content is a VirtualPayload, so the expected bytes of
+        any range of it can be regenerated for verification.
+
+        @param container_name: container to create the objects in
+        @type container_name: string
+        @param object_name: name of the top level object.  Segments and
+                            nested manifests are named after it.
+        @type object_name: string
+        @param depth: number of manifest levels, at least 1.  1 creates a
+                      plain SLO.
+        @type depth: int
+        @param fan_out: number of objects listed in each manifest, either
+                        for all levels or for each level, starting with the
+                        manifests listing segments.
+        @type fan_out: int or list of ints
+        @param segment_sizes: size of the segments, used in turn.  Defaults
+                              to min_slo_segment_size.
+        @type segment_sizes: int or list of ints
+        @param seed: seed for the object's VirtualPayload.  Defaults to a
+                     random one.
+        @type seed: string
+        @param data_pool: characters to use in generating object content
+        @type data_pool: list of characters
+        @param headers: headers to be used when creating the top level
+                        manifest
+        @type headers: dict
+
+        @return: data about the generated object.  'payload' is the
+                 object's VirtualPayload and 'seams' maps each level of the
+                 tree, 0 being the segments, to the byte offsets at which
+                 one of its objects ends and the next begins.
+        @type: dict
+        """
+        if depth < 1:
+            raise ValueError('depth must be at least 1, not {0}'.format(depth))
+
+        if isinstance(fan_out, (int, long)):
+            fan_outs = [fan_out] * depth
+        else:
+            fan_outs = list(fan_out)
+        if len(fan_outs) != depth:
+            raise ValueError(
+                'fan_out must be an int or a list of {0} ints'.format(depth))
+
+        if segment_sizes is None:
+            segment_sizes = self.api_config.min_slo_segment_size
+        if isinstance(segment_sizes, (int, long)):
+            segment_sizes = [segment_sizes]
+
+        segment_count = 1
+        for level_fan_out in fan_outs:
+            segment_count *= level_fan_out
+
+        payload = VirtualPayload(
+            seed if seed is not None else uuid4().hex,
+            sum(segment_sizes[segment_id % len(segment_sizes)]
+                for segment_id in xrange(segment_count)),
+            data_pool=data_pool)
+
+        # (name, start offset, size) of every object in the current level.
+        nodes = []
+        segment_start = 0
+        for segment_id in xrange(segment_count):
+            segment_size = segment_sizes[segment_id % len(segment_sizes)]
+            nodes.append((
+                '{0}.segment.{1}'.format(object_name, segment_id),
+                segment_start,
+                segment_size))
+            segment_start += segment_size
+
+        created_names = []
+        levels = []
+        seams = {}
+        try:
+            segment_etags = {}
+            self._create_nested_slo_level(
+                container_name, self._create_nested_slo_leaf,
+                [(name, payload, start, size, segment_etags)
+                 for name, start, size in nodes],
+                created_names)
+            etags = [segment_etags[name] for name, _, _ in nodes]
+            levels.append([name for name, _, _ in nodes])
+            seams[0] = [start for _, start, _ in nodes[1:]]
+
+            for level, level_fan_out in enumerate(fan_outs, 1):
+                parents = []
+                parent_etags = []
+                manifests = []
+                for parent_id, first in enumerate(
+                        xrange(0, len(nodes), level_fan_out)):
+                    children = nodes[first:first + level_fan_out]
+                    child_etags = etags[first:first + level_fan_out]
+
+                    if level == depth:
+                        parent_name = object_name
+                    else:
+                        parent_name = '{0}.manifest.{1}.{2}'.format(
+                            object_name, level, parent_id)
+
+                    manifests.append((
+                        parent_name,
+                        [{'path': '/{0}/{1}'.format(container_name, name),
+                          'etag': etag,
+                          'size_bytes': size}
+                         for (name, _, size), etag in zip(
+                             children, child_etags)],
+                        headers if level == depth else None))
+                    parents.append((
+                        parent_name,
+                        children[0][1],
+                        sum(size for _, _, size in children)))
+                    parent_etags.append(md5(''.join(child_etags)).hexdigest())
+
+                responses = self._create_nested_slo_level(
+                    container_name, self._create_nested_slo_manifest,
+                    manifests, created_names)
+                nodes = parents
+                etags = parent_etags
+                levels.append([name for name, _, _ in nodes])
+                if level < depth:
+                    seams[level] = [start for _, start, _ in nodes[1:]]
+        except Exception:
+            exc_info = sys.exc_info()
+            self._delete_objects(container_name, created_names)
+            raise exc_info[0], exc_info[1], exc_info[2]
+
+        return {'md5': payload.md5,
+                'etag': etags[0],
+                'size': payload.size,
+                'type': 'nested_slo',
+                'response': responses[0],
+                'payload': payload,
+                'seams': seams,
+                'extra': {'levels': levels}}
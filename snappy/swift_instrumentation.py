@@ -0,0 +1,248 @@
+import json
+import logging
+import os
+import threading
+
+from snappy.common import cclogging
+
+
+def get_url_template(url, storage_url=None, swift_endpoint=None):
+    """
+    Replaces the parts of a request url that change from test to test with
+    placeholders, so timings can be grouped by the kind of request made.
+
+    e.g. http://host/v1/AUTH_x/qe_container_1/obj?foo=bar becomes
+         {storage_url}/{container}/{object}
+
+    @return: the url template
+    @rtype: string
+    """
+    url = url.split('?')[0]
+
+    if storage_url and url.startswith(storage_url):
+        path = url[len(storage_url):].strip('/')
+        template = ['{storage_url}']
+        if path:
+            template.append('{container}')
+            if '/' in path:
+                template.append('{object}')
+        return '/'.join(template)
+
+    if swift_endpoint and url.startswith(swift_endpoint):
+        return '{{swift_endpoint}}{0}'.format(url[len(swift_endpoint):])
+
+    return url
+
+
+class RequestTiming(object):
+    """
+    Where the time went for a single call to ObjectStorageAPIClient.request.
+
+    All times are in seconds.  bytes_sent is None when the body was an
+    iterator that was not fully consumed, and bytes_received is None when
+    the response was streamed and had no Content-Length.  status_code is
+    None and error is set if the request raised an exception.
+    """
+    def __init__(self, method, url, url_template, status_code=None,
+                 bytes_sent=None, bytes_received=None, connect_time=0.0,
+                 time_to_first_byte=None, total_time=None, retries=0,
+                 trans_id=None, error=None):
+        self.method = method
+        self.url = url
+        self.url_template = url_template
+        self.status_code = status_code
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.connect_time = connect_time
+        self.time_to_first_byte = time_to_first_byte
+        self.total_time = total_time
+        self.retries = retries
+        self.trans_id = trans_id
+        self.error = error
+
+    def as_dict(self):
+        return {'method': self.method,
+                'url': self.url,
+                'url_template': self.url_template,
+                'status_code': self.status_code,
+                'bytes_sent': self.bytes_sent,
+                'bytes_received': self.bytes_received,
+                'connect_time': self.connect_time,
+                'time_to_first_byte': self.time_to_first_byte,
+                'total_time': self.total_time,
+                'retries': self.retries,
+                'trans_id': self.trans_id,
+                'error': repr(self.error) if self.error else None}
+
+    def __str__(self):
+        return ('{method} {url_template} {status_code} '
+                'sent={bytes_sent} received={bytes_received} '
+                'connect={connect_time:.4f}s ttfb={ttfb} '
+                'total={total_time:.4f}s retries={retries} '
+                'trans_id={trans_id}').format(
+            ttfb=('{0:.4f}s'.format(self.time_to_first_byte)
+                  if self.time_to_first_byte is not None else None),
+            **self.as_dict())
+
+
+class RequestHooks(object):
+    """
+    The subscribers notified with a RequestTiming after every request.
+
+    A subscriber is any callable taking the RequestTiming.  Exceptions
+    raised by a subscriber are logged and otherwise ignored so they can't
+    fail the request being timed.
+    """
+    def __init__(self):
+        self._log = cclogging.logging.getLogger(
+            cclogging.get_object_namespace(self.__class__))
+        self._lock = threading.Lock()
+        self._hooks = ()
+
+    def add(self, hook):
+        with self._lock:
+            self._hooks = self._hooks + (hook,)
+
+    def remove(self, hook):
+        with self._lock:
+            self._hooks = tuple(
+                existing for existing in self._hooks if existing is not hook)
+
+    def notify(self, timing):
+        for hook in self._hooks:
+            try:
+                hook(timing)
+            except Exception:
+                self._log.exception(
+                    'Request hook {0!r} failed'.format(hook))
+
+    def __len__(self):
+        return len(self._hooks)
+
+    def __iter__(self):
+        return iter(self._hooks)
+
+
+class CountingIterator(object):
+    """
+    Passes the chunks of an iterator through, counting their bytes.
+    """
+    def __init__(self, iterable):
+        self._iterable = iterable
+        self.bytes_read = 0
+
+    def __iter__(self):
+        for chunk in self._iterable:
+            self.bytes_read += len(chunk)
+            yield chunk
+
+
+class RequestTimingLogger(object):
+    """
+    Request hook that logs one line per request.
+    """
+    def __init__(self, log=None, level=logging.DEBUG):
+        self.log = log or cclogging.logging.getLogger(
+            cclogging.get_object_namespace(self.__class__))
+        self.level = level
+
+    def __call__(self, timing):
+        self.log.log(self.level, str(timing))
+
+
+class RequestTimingAggregator(object):
+    """
+    Request hook that keeps running totals per (method, url template).
+
+    Usage:
+        aggregator = RequestTimingAggregator()
+        client.add_request_hook(aggregator)
+        ...
+        for entry in aggregator.summary():
+            print entry
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _new_stats(self, method, url_template):
+        return {'method': method,
+                'url_template': url_template,
+                'count': 0,
+                'errors': 0,
+                'statuses': {},
+                'retries': 0,
+                'bytes_sent': 0,
+                'bytes_received': 0,
+                'connect_time': 0.0,
+                'time_to_first_byte': 0.0,
+                'total_time': 0.0,
+                'min_time': None,
+                'max_time': None}
+
+    def __call__(self, timing):
+        key = (timing.method, timing.url_template)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = self._new_stats(*key)
+
+            stats['count'] += 1
+            if timing.error is not None:
+                stats['errors'] += 1
+            else:
+                statuses = stats['statuses']
+                statuses[timing.status_code] = statuses.get(
+                    timing.status_code, 0) + 1
+            stats['retries'] += timing.retries
+            stats['bytes_sent'] += timing.bytes_sent or 0
+            stats['bytes_received'] += timing.bytes_received or 0
+            stats['connect_time'] += timing.connect_time or 0.0
+            stats['time_to_first_byte'] += timing.time_to_first_byte or 0.0
+
+            total_time = timing.total_time or 0.0
+            stats['total_time'] += total_time
+            if stats['min_time'] is None or total_time < stats['min_time']:
+                stats['min_time'] = total_time
+            if stats['max_time'] is None or total_time > stats['max_time']:
+                stats['max_time'] = total_time
+
+    def summary(self):
+        """
+        @return: a copy of the totals for each kind of request, with the
+                 mean time added, most total time first.
+        @rtype: list of dictionaries
+        """
+        with self._lock:
+            entries = [dict(stats, statuses=dict(stats['statuses']))
+                       for stats in self._stats.values()]
+
+        for entry in entries:
+            entry['mean_time'] = entry['total_time'] / entry['count']
+        return sorted(
+            entries, key=lambda entry: entry['total_time'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+class RequestTimingFileExporter(object):
+    """
+    Request hook that appends each RequestTiming to a file as a line of
+    JSON.  Each record is written with a single append, so several
+    processes can export to the same file.
+    """
+    def __init__(self, path):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def __call__(self, timing):
+        line = '{0}\n'.format(json.dumps(timing.as_dict()))
+        with self._lock:
+            with open(self.path, 'a') as export_file:
+                export_file.write(line)
@@ -1,22 +1,43 @@
 import json
 from xml.etree import ElementTree
 from snappy.common.models import AutoMarshallingListModel
+from snappy.tools.incremental_parse import iter_json_array, iter_xml_records
 
 
 class StorageObject(object):
-    def __init__(self, name, bytes_, hash_, last_modified, content_type):
+    # Listings can hold millions of these, so they have slots instead of a
+    # per instance __dict__.
+    __slots__ = ('name', 'bytes_', 'hash_', 'last_modified', 'content_type',
+                 'subdir')
+
+    def __init__(self, name, bytes_, hash_, last_modified, content_type,
+                 subdir=None):
         self.name = name
         self.bytes_ = bytes_
         self.hash_ = hash_
         self.last_modified = last_modified
         self.content_type = content_type
+        # Set instead of name for the pseudo-directories of a listing made
+        # with a delimiter.
+        self.subdir = subdir
+
+    def __repr__(self):
+        return '<StorageObject name={0!r} bytes={1}>'.format(
+            self.name if self.subdir is None else self.subdir, self.bytes_)
 
 
 class Container(object):
-    def __init__(self, name=None, count=None, bytes_=None):
+    __slots__ = ('name', 'count', 'bytes_', 'subdir')
+
+    def __init__(self, name=None, count=None, bytes_=None, subdir=None):
         self.name = name
         self.count = count
         self.bytes_ = bytes_
+        self.subdir = subdir
+
+    def __repr__(self):
+        return '<Container name={0!r} count={1}>'.format(
+            self.name if self.subdir is None else self.subdir, self.count)
 
 
 class ArchiveObject(object):
@@ -28,6 +49,46 @@ class ArchiveObject(object):
         self.status = status
 
 
+class ObjectDownload(object):
+    """
+    Result of a streamed object download.  Holds the digest and timing of
+    the transfer instead of the object's content.
+    """
+    def __init__(self, response=None, md5=None, size=0,
+                 time_to_first_byte=None, elapsed=None):
+        self.response = response
+        self.md5 = md5
+        self.size = size
+        self.time_to_first_byte = time_to_first_byte
+        self.elapsed = elapsed
+
+    @property
+    def etag(self):
+        if self.response is None:
+            return None
+        etag = self.response.headers.get('etag')
+        return etag.strip('"') if etag else etag
+
+    @property
+    def etag_matches(self):
+        """
+        True if the md5 of the downloaded bytes matches the ETag header.
+        This is only expected to hold for standard objects: the ETag of a
+        static or dynamic large object is the md5 of its segment ETags, not
+        of its content.
+        """
+        return self.md5 == self.etag
+
+    @property
+    def transfer_rate(self):
+        """
+        Bytes per second over the whole request.
+        """
+        if not self.elapsed:
+            return None
+        return self.size / self.elapsed
+
+
 class AccountContainersList(AutoMarshallingListModel):
 
     @classmethod
@@ -46,6 +107,14 @@ class AccountContainersList(AutoMarshallingListModel):
         data = json.loads(serialized_str)
         return cls._list_to_obj(data)
 
+    @classmethod
+    def _xml_stream_to_obj(cls, chunks):
+        return cls._list_to_obj(iter_xml_records(chunks))
+
+    @classmethod
+    def _json_stream_to_obj(cls, chunks):
+        return cls._list_to_obj(iter_json_array(chunks))
+
     @classmethod
     def _list_to_obj(cls, data):
         account_containers_list = AccountContainersList()
@@ -53,7 +122,8 @@ class AccountContainersList(AutoMarshallingListModel):
             container = Container(
                 name=obj.get('name'),
                 bytes_=obj.get('bytes'),
-                count=obj.get('count'))
+                count=obj.get('count'),
+                subdir=obj.get('subdir'))
             account_containers_list.append(container)
         return account_containers_list
 
@@ -90,16 +160,32 @@ class ContainerObjectsList(AutoMarshallingListModel):
         data = json.loads(serialized_str)
         return cls._list_to_obj(data)
 
+    @classmethod
+    def _xml_stream_to_obj(cls, chunks):
+        return cls._list_to_obj(iter_xml_records(chunks))
+
+    @classmethod
+    def _json_stream_to_obj(cls, chunks):
+        return cls._list_to_obj(iter_json_array(chunks))
+
     @classmethod
     def _list_to_obj(cls, data):
         container_objects_list = ContainerObjectsList()
+        # Most objects in a container share a handful of content types, so
+        # every object with the same one references a single string.
+        content_types = {}
         for obj in data:
+            content_type = obj.get('content_type')
+            if content_type is not None:
+                content_type = content_types.setdefault(
+                    content_type, content_type)
             storage_object = StorageObject(
                 name=obj.get('name'),
                 bytes_=obj.get('bytes'),
                 hash_=obj.get('hash'),
                 last_modified=obj.get('last_modified'),
-                content_type=obj.get('content_type'))
+                content_type=content_type,
+                subdir=obj.get('subdir'))
             container_objects_list.append(storage_object)
         return container_objects_list
 
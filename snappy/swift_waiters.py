@@ -0,0 +1,169 @@
+from os.path import commonprefix
+
+from snappy.common import cclogging
+from snappy.swift_client import ObjectStorageListingException
+from snappy.tools.retry import RetryPolicy
+
+
+class ObjectStorageWaiters(object):
+    """
+    Waits for the cluster to converge on a state, instead of sleeping for
+    the worst case time it could take.
+
+    Each wait polls with a RetryPolicy, backing off from
+    retry_initial_sleep_time to retry_sleep_time, until the state is seen
+    or the timeout passes.  Object and container state is polled with
+    HEAD requests, so polling costs no more than a request and its
+    headers.
+
+    Every wait returns the RetryResult of its polling, whose elapsed is how
+    long the cluster took to converge when succeeded is True.  The results
+    are also recorded per wait in snappy.tools.retry.retry_stats.
+
+    Usage:
+        result = waiters.wait_until_absent(container_name, object_name,
+                                           timeout=70)
+        self.assertTrue(result.succeeded)
+    """
+    def __init__(self, client, config):
+        self._log = cclogging.logging.getLogger(
+            cclogging.get_object_namespace(self.__class__))
+        self.client = client
+        self.config = config
+
+    def get_policy(self, timeout=None):
+        """
+        @param timeout: seconds to wait for, defaults to max_retry_count *
+                        retry_sleep_time.
+        @type timeout: float
+
+        @return: the policy waits poll with.
+        @rtype: snappy.tools.retry.RetryPolicy
+        """
+        if timeout is None:
+            timeout = (
+                self.config.max_retry_count * self.config.retry_sleep_time)
+        return RetryPolicy(
+            initial_delay=self.config.retry_initial_sleep_time,
+            max_delay=self.config.retry_sleep_time,
+            timeout=timeout)
+
+    def wait_for(self, func, func_args=None, func_kwargs=None,
+                 success_func=None, timeout=None, call_site=None):
+        """
+        Calls func until success_func returns True for its response or
+        timeout seconds have passed.
+
+        @return: the outcome of polling.
+        @rtype: snappy.tools.retry.RetryResult
+        """
+        result = self.get_policy(timeout).run(
+            func, func_args=func_args, func_kwargs=func_kwargs,
+            success_func=success_func, call_site=call_site)
+        self._log.debug('wait {0}'.format(result))
+        return result
+
+    def _head(self, container_name=None, object_name=None):
+        if object_name is not None:
+            return self.client.get_object_metadata(
+                container_name, object_name)
+        if container_name is not None:
+            return self.client.get_container_metadata(container_name)
+        return self.client.get_account_metadata()
+
+    def wait_until_absent(self, container_name, object_name=None,
+                          timeout=None):
+        """
+        Waits until the object, or the container if no object name is
+        given, returns a 404, e.g. once an expiring object has expired.
+
+        @return: the outcome of polling.
+        @rtype: snappy.tools.retry.RetryResult
+        """
+        return self.wait_for(
+            self._head, func_args=[container_name, object_name],
+            success_func=lambda response: response.status_code == 404,
+            timeout=timeout, call_site='wait_until_absent')
+
+    def wait_for_header(self, header, container_name=None, object_name=None,
+                        value=None, timeout=None):
+        """
+        Waits until the object, container or, if neither is given, the
+        account has the header, with the value if one is given.
+
+        @param header: name of the header, case insensitive.
+        @type header: string
+        @param value: the header's expected value.  If None, any value will
+                      do.
+        @type value: string
+
+        @return: the outcome of polling.
+        @rtype: snappy.tools.retry.RetryResult
+        """
+        def success_func(response):
+            if not response.ok or header not in response.headers:
+                return False
+            return value is None or response.headers[header] == str(value)
+
+        return self.wait_for(
+            self._head, func_args=[container_name, object_name],
+            success_func=success_func, timeout=timeout,
+            call_site='wait_for_header')
+
+    def wait_for_object_count(self, container_name, expected_count,
+                              timeout=None):
+        """
+        Waits until the container's X-Container-Object-Count is
+        expected_count.
+
+        @return: the outcome of polling.
+        @rtype: snappy.tools.retry.RetryResult
+        """
+        def success_func(response):
+            object_count = response.headers.get('x-container-object-count')
+            return response.ok and object_count == str(expected_count)
+
+        return self.wait_for(
+            self.client.get_container_metadata, func_args=[container_name],
+            success_func=success_func, timeout=timeout,
+            call_site='wait_for_object_count')
+
+    def wait_for_listing_contains(self, container_name, object_names,
+                                  timeout=None):
+        """
+        Waits until every one of object_names is in the container's
+        listing.  Listings can't be HEADed, so only the part of the listing
+        under the names' common prefix is requested, and only up to the
+        point where every name has been seen.
+
+        @param object_names: names expected to be listed.
+        @type object_names: list of strings
+
+        @return: the outcome of polling.  Its response is the set of names
+                 that were not listed by the last poll.
+        @rtype: snappy.tools.retry.RetryResult
+        """
+        object_names = set(
+            name.decode('utf-8') if isinstance(name, str) else name
+            for name in object_names)
+        params = {}
+        prefix = commonprefix(list(object_names))
+        if prefix:
+            params['prefix'] = prefix
+
+        def get_missing_names():
+            missing = set(object_names)
+            try:
+                for storage_object in self.client.iter_objects(
+                        container_name, params=params):
+                    missing.discard(storage_object.name)
+                    if not missing:
+                        break
+            except ObjectStorageListingException as e:
+                # The container may not be listable yet either.
+                self._log.debug('wait_for_listing_contains: {0}'.format(e))
+            return missing
+
+        return self.wait_for(
+            get_missing_names, success_func=lambda missing: not missing,
+            timeout=timeout, call_site='wait_for_listing_contains')
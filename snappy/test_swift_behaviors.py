@@ -0,0 +1,102 @@
+import unittest
+from time import time
+
+from snappy.swift_behaviors import (
+    ObjectStorageAPIBehaviorException, ObjectStorageAPI_Behaviors)
+
+
+class FakeConfig(object):
+    max_retry_count = 5
+    retry_sleep_time = 0.2
+    retry_initial_sleep_time = 0.01
+
+
+class FakeResponse(object):
+    def __init__(self, ok):
+        self.ok = ok
+
+
+class FakeResult(object):
+    def __init__(self, item, response):
+        self.item = item
+        self.response = response
+
+    def get(self):
+        return self.response
+
+
+class FakeClient(object):
+    def __init__(self, failing_names=()):
+        self.failing_names = failing_names
+        self.items = []
+
+    def batch_create_objects(self, objects, headers=None):
+        self.items.extend(objects)
+        return [
+            FakeResult(item, FakeResponse(item[1] not in self.failing_names))
+            for item in objects]
+
+
+class RetryUntilSuccessTest(unittest.TestCase):
+    def setUp(self):
+        self.behaviors = ObjectStorageAPI_Behaviors(config=FakeConfig())
+        self.calls = []
+
+    def _fail(self):
+        self.calls.append(time())
+        return False
+
+    def _retry(self, **kwargs):
+        start = time()
+        self.behaviors.retry_until_success(
+            self._fail, success_func=lambda response: response, **kwargs)
+        return time() - start
+
+    def assert_window(self, elapsed, max_retries, sleep_time):
+        # Retrying used to sleep sleep_time after each of max_retries
+        # attempts, so it gave up after max_retries * sleep_time seconds.
+        self.assertAlmostEqual(
+            elapsed, max_retries * sleep_time, delta=0.1,
+            msg='gave up after {0:.2f}s and {1} attempts'.format(
+                elapsed, len(self.calls)))
+
+    def test_default_window(self):
+        elapsed = self._retry()
+        self.assert_window(
+            elapsed, FakeConfig.max_retry_count, FakeConfig.retry_sleep_time)
+        self.assertGreater(len(self.calls), FakeConfig.max_retry_count)
+
+    def test_window_for_more_retries(self):
+        elapsed = self._retry(max_retries=10, sleep_time=0.1)
+        self.assert_window(elapsed, 10, 0.1)
+
+    def test_deadline(self):
+        elapsed = self._retry(max_retries=10, deadline=time() + 0.3)
+        self.assertAlmostEqual(elapsed, 0.3, delta=0.1)
+
+    def test_success_is_not_retried(self):
+        start = time()
+        response = self.behaviors.retry_until_success(
+            lambda: 'response', success_func=lambda response: True)
+        self.assertEqual(response, 'response')
+        self.assertLess(time() - start, 0.1)
+
+
+class CreateObjectsTest(unittest.TestCase):
+    def test_create_objects(self):
+        client = FakeClient()
+        behaviors = ObjectStorageAPI_Behaviors(client=client)
+        responses = behaviors.create_objects(
+            'container', ['a', 'b'], data='data')
+        self.assertEqual(len(responses), 2)
+        self.assertEqual(
+            client.items, [('container', 'a', 'data'),
+                           ('container', 'b', 'data')])
+
+    def test_create_objects_failure(self):
+        behaviors = ObjectStorageAPI_Behaviors(
+            client=FakeClient(failing_names=['b']))
+        with self.assertRaises(ObjectStorageAPIBehaviorException) as context:
+            behaviors.create_objects('container', ['a', 'b'], data='data')
+        self.assertIn('container/b', str(context.exception))
+        self.assertFalse(context.exception.response.ok)
@@ -1,5 +1,5 @@
 from calendar import timegm
-from time import gmtime, sleep
+from time import gmtime
 
 from snappy.common.decorators import (DataDrivenFixture, data_driven_test)
 
@@ -21,6 +21,24 @@ class ExpiringObjectTest(ObjectStorageFixture):
         cls.default_obj_name = Constants.VALID_OBJECT_NAME
         cls.default_obj_data = Constants.VALID_OBJECT_DATA
 
+    def wait_until_expired(self, container_name, object_name, timeout=None):
+        """
+        Polls the object until it's gone, for up to timeout seconds,
+        defaulting to object_deletion_wait_interval from config, and fails
+        the test if it's still there after that.
+        """
+        if timeout is None:
+            timeout = (
+                self.objectstorage_api_config.object_deletion_wait_interval)
+        result = self.waiters.wait_until_absent(
+            container_name, object_name, timeout=timeout)
+        self.assertTrue(
+            result.succeeded,
+            msg='object {0}/{1} had not expired after {2} seconds and {3} '
+                'checks'.format(
+                    container_name, object_name, timeout, result.attempts))
+        return result
+
     @data_driven_test(ObjectDatasetList())
     def ddtest_object_creation_with_x_delete_at(self, object_type,
                                                 generate_object):
@@ -38,8 +56,8 @@ class ExpiringObjectTest(ObjectStorageFixture):
         content_length = response.headers.get('content-length')
         self.assertNotEqual(content_length, 0)
 
-        # Wait for object to expire using interval from config
-        sleep(self.objectstorage_api_config.object_deletion_wait_interval)
+        # Wait for object to expire, for up to the interval from config
+        self.wait_until_expired(container_name, object_name)
 
         response = self.client.get_object(container_name, object_name)
 
@@ -60,7 +78,7 @@ class ExpiringObjectTest(ObjectStorageFixture):
         self.assertNotEqual(content_length, 0)
 
         # wait for the object to expire - delete after 60 seconds + 10 seconds
-        sleep(70)
+        self.wait_until_expired(container_name, object_name, timeout=70)
 
         response = self.client.get_object(container_name, object_name)
 
@@ -104,8 +122,8 @@ class ExpiringObjectTest(ObjectStorageFixture):
                 expected=expected,
                 received=str(received)))
 
-        # Sleep for period set as X-Delete-After(object expiration)
-        sleep(delete_after)
+        # Wait for the object to expire, for up to the interval from config
+        self.wait_until_expired(container_name, object_name)
 
         object_response = self.client.get_object(container_name, object_name)
 
@@ -160,8 +178,8 @@ class ExpiringObjectTest(ObjectStorageFixture):
                 expected=expected,
                 received=str(received)))
 
-        # Wait for object to expire using interval from config
-        sleep(self.objectstorage_api_config.object_deletion_wait_interval)
+        # Wait for object to expire, for up to the interval from config
+        self.wait_until_expired(container_name, object_name)
 
         object_response = self.client.get_object(container_name, object_name)
 
@@ -218,7 +236,7 @@ class ExpiringObjectTest(ObjectStorageFixture):
             'Object should exist before X-Delete-At.')
 
         # wait for the object to be deleted.
-        sleep(self.objectstorage_api_config.object_deletion_wait_interval)
+        self.wait_until_expired(container_name, self.default_obj_name)
 
         resp = self.client.get_object(container_name, self.default_obj_name)
 
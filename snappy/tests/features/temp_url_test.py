@@ -1172,12 +1172,14 @@ class TempUrlTest(ObjectStorageFixture):
             self.object_data,
             'object should contain correct data.')
 
-        time.sleep(int(TEMPURL_KEY_LIFE) + 60)
-
-        response = self.http.request(
-            "GET",
-            tempurl_data.get('target_url'),
-            params=params)
+        result = self.waiters.wait_for(
+            self.http.request,
+            func_args=["GET", tempurl_data.get('target_url')],
+            func_kwargs={'params': params},
+            success_func=lambda response: response.status_code == 401,
+            timeout=int(TEMPURL_KEY_LIFE) + 60,
+            call_site='wait_for_tempurl_expiry')
+        response = result.response
 
         self.assertEqual(
             response.status_code,
@@ -24,16 +24,6 @@ class NestedSLOTest(ObjectStorageFixture):
         self.container_name = self.create_temp_container(
             descriptor=CONTAINER_DESCRIPTOR)
 
-    def generate_data(self):
-        data = ""
-
-        # This will create enough data to make 4 segments, with the last
-        # segment being smaller than the min segment size.
-        while len(data) < (self.min_segment_size * 3.5):
-            data += "The is a sentence that will create segments."
-
-        return data
-
     def test_nested_slo_creation_same_container(self):
         """
         Scenario:
@@ -153,44 +143,29 @@ class NestedSLOTest(ObjectStorageFixture):
             Try to execute range requests on the seams of a nested SLO.
 
         Expected Results:
-            Object retrieval should return a 200 and the sumation of all
-            the segment sizes should equal the retrieved object length.
+            Range requests across every seam in the nested SLO should return
+            a 206 and the bytes in the requested range.
         """
-        manifest = []
-        slo_seams = []
-        segment_count = 0
-
-        for i in range(self.nested_object_count):
-
-            slo = self.generator.generate_static_large_object(
-                self.container_name,
-                "{0}_{1}".format(self.default_obj_name, i),
-                data=self.generate_data())
-
-            for x in range(slo.get("size") / self.min_segment_size):
-                segment_count += 1
-                slo_seams.append("{0}-{1}".format(
-                    (self.min_segment_size * segment_count)-2,
-                    (self.min_segment_size * segment_count)+2))
-
-            manifest.append(
-                {'path': "/{0}/{1}_{2}".format(self.container_name,
-                                               self.default_obj_name,
-                                               i),
-                 'etag': slo.get("etag"),
-                 'size_bytes': slo.get("size")})
-
-        self.client.create_object(
+        # Create enough data to make 4 segments for each of the nested SLOs,
+        # with the last segment being smaller than the min segment size.
+        nested_slo = self.generator.generate_nested_static_large_object(
             self.container_name,
             self.nested_obj_name,
-            data=json.dumps(manifest),
-            params={'multipart-manifest': 'put'})
+            depth=2,
+            fan_out=[4, self.nested_object_count],
+            segment_sizes=[self.min_segment_size] * 3 +
+                          [self.min_segment_size / 2])
+        payload = nested_slo.get('payload')
+
+        slo_seams = sorted(set(
+            seam for level_seams in nested_slo.get('seams').values()
+            for seam in level_seams))
 
         method = 'Nested Static Large Object Range Request'
         expected = 206
 
         for seam in slo_seams:
-            headers = {'Range': 'bytes={0}'.format(seam)}
+            headers = {'Range': 'bytes={0}-{1}'.format(seam - 2, seam + 2)}
             range_response = self.client.get_object(
                 self.container_name,
                 self.nested_obj_name,
@@ -205,3 +180,52 @@ class NestedSLOTest(ObjectStorageFixture):
                     method=method,
                     expected=expected,
                     received=str(received)))
+
+            self.assertEqual(
+                payload.slice(seam - 2, seam + 3),
+                range_response.content,
+                msg="Range {0}-{1} of the nested SLO does not match the "
+                    "data uploaded".format(seam - 2, seam + 2))
+
+    def test_nested_slo_download(self):
+        """
+        Scenario:
+            Stream a nested SLO with download_object.
+
+        Expected Results:
+            The download should return a 200 and the md5 and size of the
+            bytes received should match the data uploaded.
+        """
+        nested_slo = self.generator.generate_nested_static_large_object(
+            self.container_name,
+            self.nested_obj_name,
+            depth=2,
+            fan_out=[3, self.nested_object_count])
+        payload = nested_slo.get('payload')
+
+        download = self.client.download_object(
+            self.container_name, self.nested_obj_name)
+
+        method = 'Nested Static Large Object Download'
+        expected = 200
+        received = download.response.status_code
+
+        self.assertEqual(
+            expected,
+            received,
+            msg=STATUS_CODE_MSG.format(
+                method=method,
+                expected=expected,
+                received=str(received)))
+
+        self.assertEqual(
+            len(payload),
+            download.size,
+            msg="Downloaded {0} bytes of the nested SLO, expected "
+                "{1}".format(download.size, len(payload)))
+
+        self.assertEqual(
+            payload.md5,
+            download.md5,
+            msg="md5 of the downloaded nested SLO does not match the "
+                "data uploaded")
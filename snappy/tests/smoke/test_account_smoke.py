@@ -25,8 +25,7 @@ class AccountSmokeTest(ObjectStorageFixture):
     @classmethod
     def tearDownClass(cls):
         super(AccountSmokeTest, cls).setUpClass()
-        for container_name in cls.container_names:
-            cls.behaviors.force_delete_containers([container_name])
+        cls.behaviors.force_delete_containers(cls.container_names)
 
     def test_container_list(self):
         response = self.client.list_containers()
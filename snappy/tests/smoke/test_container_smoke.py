@@ -22,12 +22,9 @@ class ContainerSmokeTest(ObjectStorageFixture):
 
         cls.obj_names = ["b_obj", "c_obj", "d_obj", "e_obj", "f_obj", "g_obj"]
 
-        for obj_name in cls.obj_names:
-            cls.client.create_object(
-                cls.container_name,
-                obj_name,
-                headers=headers,
-                data=object_data)
+        cls.behaviors.create_objects(
+            cls.container_name, cls.obj_names, data=object_data,
+            headers=headers)
 
     @classmethod
     def tearDownClass(cls):
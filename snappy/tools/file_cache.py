@@ -0,0 +1,72 @@
+import errno
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+
+
+class LockedJSONFile(object):
+    """
+    A JSON document on disk shared between processes, e.g. parallel pytest
+    workers.  Readers and writers serialize on an exclusive lock held on a
+    separate '<path>.lock' file, so a process can read, update and write the
+    document without another process interleaving.
+
+    The document may hold credentials such as auth tokens, so directories
+    made for it are only accessible by their owner, and the document and
+    its lock file only readable by their owner.
+
+    Usage:
+        cache_file = LockedJSONFile('~/.temp/cache.json')
+        with cache_file.locked():
+            data = cache_file.read()
+            data['key'] = 'value'
+            cache_file.write(data)
+    """
+    def __init__(self, path):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.lock_path = '{0}.lock'.format(self.path)
+
+    def _ensure_directory(self):
+        directory = os.path.dirname(self.path)
+        try:
+            os.makedirs(directory, 0700)
+        except OSError as error:
+            if error.errno != errno.EEXIST:
+                raise
+
+    @contextmanager
+    def locked(self):
+        self._ensure_directory()
+        lock_file = os.fdopen(
+            os.open(self.lock_path, os.O_WRONLY | os.O_CREAT, 0600), 'a')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            yield self
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            lock_file.close()
+
+    def read(self):
+        """
+        Returns the document, or an empty dict if the file is missing or
+        can't be parsed.
+        """
+        try:
+            with open(self.path) as cache_file:
+                data = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def write(self, data):
+        """
+        Replaces the document.
+        """
+        self._ensure_directory()
+        temp_path = '{0}.{1}.tmp'.format(self.path, os.getpid())
+        temp_fd = os.open(
+            temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0600)
+        with os.fdopen(temp_fd, 'w') as temp_file:
+            json.dump(data, temp_file)
+        os.rename(temp_path, self.path)
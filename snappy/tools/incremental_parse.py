@@ -0,0 +1,145 @@
+import json
+from xml.etree import ElementTree
+
+_WHITESPACE = ' \t\n\r'
+
+
+class _ChunkReader(object):
+    """
+    Minimal file-like object reading from an iterator of chunks, for
+    parsers that pull their input with read().
+    """
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = ''
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data = self._buffer + ''.join(self._chunks)
+            self._buffer = ''
+            return data
+
+        while len(self._buffer) < size:
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                break
+        data = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return data
+
+
+def iter_json_array(chunks):
+    """
+    Yields the elements of a JSON array as its text arrives in chunks.
+
+    Only the element being decoded and the unparsed rest of the current
+    chunk are held in memory, rather than the whole document and the
+    whole decoded list as with json.loads.
+
+    @param chunks: the document's text, e.g. response.iter_content()
+    @type chunks: iterable of strings
+
+    @return: a generator of the decoded elements
+    @rtype: generator
+    """
+    decoder = json.JSONDecoder()
+    chunks = iter(chunks)
+    buffer = ''
+    position = 0
+    exhausted = False
+    # What has to come next: '[' to open the array, the first element or
+    # the ']' of an empty array, an element, or the ',' or ']' following
+    # an element.
+    expecting = '['
+
+    while True:
+        while position < len(buffer) and buffer[position] in _WHITESPACE:
+            position += 1
+
+        if position >= len(buffer):
+            if exhausted:
+                raise ValueError('JSON array ended before its closing ]')
+            try:
+                buffer = buffer[position:] + next(chunks)
+            except StopIteration:
+                exhausted = True
+            position = 0
+            continue
+
+        char = buffer[position]
+        if expecting == '[':
+            if char != '[':
+                raise ValueError(
+                    'Expected a JSON array, found {0!r}'.format(char))
+            position += 1
+            expecting = 'first'
+        elif expecting == 'separator':
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(
+                    'Expected , or ] in JSON array, found {0!r}'.format(char))
+            position += 1
+            expecting = 'element'
+        elif char == ']' and expecting == 'first':
+            return
+        else:
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                element, end = None, None
+
+            # An element running to the end of the buffer may be cut
+            # short, e.g. a number, so wait for more text unless there
+            # is none.
+            if end is None or (end == len(buffer) and not exhausted):
+                if exhausted:
+                    raise ValueError(
+                        'Invalid JSON array element at {0!r}'.format(
+                            buffer[position:position + 40]))
+                try:
+                    buffer = buffer[position:] + next(chunks)
+                except StopIteration:
+                    exhausted = True
+                    buffer = buffer[position:]
+                position = 0
+                continue
+
+            position = end
+            expecting = 'separator'
+            yield element
+
+
+def iter_xml_records(chunks):
+    """
+    Yields a dictionary of {tag: text} for each child of an XML document's
+    root element, e.g. each <object> of a swift listing, as the document's
+    text arrives in chunks.
+
+    Each record is dropped from the tree once it's been yielded, so memory
+    use doesn't grow with the number of records the way it does when the
+    whole document is parsed with ElementTree.fromstring.
+
+    @param chunks: the document's text, e.g. response.iter_content()
+    @type chunks: iterable of strings
+
+    @return: a generator of dictionaries
+    @rtype: generator
+    """
+    depth = 0
+    root = None
+    for event, element in ElementTree.iterparse(
+            _ChunkReader(chunks), events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            if root is None:
+                root = element
+            continue
+
+        depth -= 1
+        if depth == 1:
+            yield dict(
+                (sub_element.tag, sub_element.text)
+                for sub_element in element)
+            root.clear()
@@ -0,0 +1,199 @@
+from bisect import bisect_left, bisect_right
+
+# Swift's default, and max, number of entries in a listing.
+DEFAULT_LISTING_LIMIT = 10000
+
+
+def _to_key(value):
+    """
+    Swift sorts listings by the UTF-8 bytes of each name, so names are
+    indexed, and compared with markers, as UTF-8 strings.
+    """
+    if isinstance(value, unicode):
+        return value.encode('utf-8')
+    return value
+
+
+def _to_name(key):
+    return key.decode('utf-8')
+
+
+def _get_upper_bound(prefix):
+    """
+    Returns the smallest string that is greater than every string starting
+    with prefix, or None if there is no such string.
+    """
+    while prefix:
+        last = ord(prefix[-1])
+        if last < 255:
+            return prefix[:-1] + chr(last + 1)
+        prefix = prefix[:-1]
+    return None
+
+
+class ListingIndex(object):
+    """
+    A sorted, in memory index of the names in a container or account that
+    answers swift listing queries locally, so a listing response can be
+    checked without working out its expected content by hand or listing
+    again.
+
+    Queries follow swift's rules for prefix, delimiter, marker, end_marker
+    and limit, including rolling names up into a subdir at the first
+    delimiter after the prefix.  Each query costs O(log n) per entry
+    returned, using bisect to skip past everything a subdir stands for.
+
+    Usage:
+        index = ListingIndex(object_names)
+        response = client.list_objects(
+            container, params={'prefix': 'a/', 'delimiter': '/'})
+        assert response.content.decode('utf-8').splitlines() == index.query(
+            prefix='a/', delimiter='/')
+
+        index = ListingIndex.from_listing(client.iter_objects(container))
+    """
+    def __init__(self, names=None, default_limit=DEFAULT_LISTING_LIMIT):
+        """
+        @param names: names to index, as unicode or UTF-8 strings.
+        @type names: iterable
+        @param default_limit: number of entries returned by a query that
+                              doesn't set a limit.
+        @type default_limit: int
+        """
+        self.default_limit = default_limit
+        self._keys = sorted(set(_to_key(name) for name in names or []))
+        self._records = {}
+
+    @classmethod
+    def from_listing(cls, entries, default_limit=DEFAULT_LISTING_LIMIT):
+        """
+        Indexes the entries of a full listing, e.g. from iter_objects or
+        iter_containers, keeping each entry as the record for its name.
+        Pseudo-directories of listings made with a delimiter are skipped.
+        """
+        index = cls(default_limit=default_limit)
+        for entry in entries:
+            if entry.name is not None:
+                index.add(entry.name, record=entry)
+        return index
+
+    def add(self, name, record=None):
+        """
+        Adds a name, e.g. after creating an object.  If given, record is
+        kept for the name and returned by get.
+        """
+        key = _to_key(name)
+        position = bisect_left(self._keys, key)
+        if position == len(self._keys) or self._keys[position] != key:
+            self._keys.insert(position, key)
+        if record is not None:
+            self._records[key] = record
+
+    def discard(self, name):
+        """
+        Removes a name, e.g. after deleting an object, if it's indexed.
+        """
+        key = _to_key(name)
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            del self._keys[position]
+        self._records.pop(key, None)
+
+    def get(self, name, default=None):
+        """
+        @return: the record kept for name, see add.
+        """
+        return self._records.get(_to_key(name), default)
+
+    def __contains__(self, name):
+        key = _to_key(name)
+        position = bisect_left(self._keys, key)
+        return position < len(self._keys) and self._keys[position] == key
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        for key in self._keys:
+            yield _to_name(key)
+
+    def iter_query(self, prefix=None, delimiter=None, marker=None,
+                   end_marker=None):
+        """
+        Yields (name, is_subdir) for every entry of the listing described
+        by the arguments, in listing order, without a limit.
+        """
+        keys = self._keys
+        prefix = _to_key(prefix or '')
+        delimiter = _to_key(delimiter or '')
+        marker = _to_key(marker or '')
+        end_marker = _to_key(end_marker or '')
+
+        start = bisect_left(keys, prefix)
+        if marker:
+            start = max(start, bisect_right(keys, marker))
+
+        stop = len(keys)
+        upper_bound = _get_upper_bound(prefix)
+        if upper_bound is not None:
+            stop = bisect_left(keys, upper_bound, start)
+        if end_marker:
+            stop = min(stop, bisect_left(keys, end_marker, start))
+
+        position = start
+        while position < stop:
+            key = keys[position]
+            if delimiter:
+                end = key.find(delimiter, len(prefix))
+                if end >= 0:
+                    subdir = key[:end + len(delimiter)]
+                    # Like swift, a subdir equal to the marker has already
+                    # been listed.
+                    if subdir != marker:
+                        yield _to_name(subdir), True
+                    upper_bound = _get_upper_bound(subdir)
+                    if upper_bound is None:
+                        return
+                    position = bisect_left(keys, upper_bound, position, stop)
+                    continue
+
+            yield _to_name(key), False
+            position += 1
+
+    def query(self, prefix=None, delimiter=None, marker=None,
+              end_marker=None, limit=None):
+        """
+        Lists the index like swift would.
+
+        @return: the names, and subdirs, of the listing, as they appear in
+                 a plain text listing.
+        @rtype: list of unicode
+        """
+        if limit is None:
+            limit = self.default_limit
+
+        names = []
+        if limit <= 0:
+            return names
+        for name, _ in self.iter_query(
+                prefix=prefix, delimiter=delimiter, marker=marker,
+                end_marker=end_marker):
+            names.append(name)
+            if len(names) >= limit:
+                break
+        return names
+
+    def query_params(self, params):
+        """
+        Shortcut for query taking the params of a list_objects or
+        list_containers call.  format and any other params that don't
+        change which entries are listed are ignored.
+        """
+        params = params or {}
+        limit = params.get('limit')
+        return self.query(
+            prefix=params.get('prefix'),
+            delimiter=params.get('delimiter'),
+            marker=params.get('marker'),
+            end_marker=params.get('end_marker'),
+            limit=int(limit) if limit is not None else None)
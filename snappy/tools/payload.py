@@ -0,0 +1,334 @@
+import os
+import threading
+from binascii import unhexlify
+from hashlib import md5
+from random import Random
+from struct import unpack
+
+from snappy.tools.unicode_helpers import UNICODE_BLOCKS, BLOCK_NAMES
+
+DEFAULT_BLOCK_SIZE = 1048576
+
+# Translation tables keyed by data pool, see _get_translation_table.
+_translation_tables = {}
+_translation_tables_lock = threading.Lock()
+
+
+def _get_translation_table(data_pool):
+    """
+    Returns a table for str.translate mapping byte values to characters
+    from data_pool, and the byte values to delete when translating.  The
+    table is None if data_pool has characters longer than a byte and can't
+    be used with str.translate.
+
+    Byte values are assigned to the pool's characters in turn, up to the
+    largest multiple of the pool's size, and the rest are deleted, so that
+    every character is equally likely to be picked by a random byte.  Pools
+    of more than 256 characters can't be picked from with a byte, see
+    _get_random_indices.
+    """
+    key = tuple(data_pool)
+    with _translation_tables_lock:
+        if key not in _translation_tables:
+            usable = 256 - 256 % len(key) if len(key) <= 256 else 256
+            table = None
+            if len(key) <= 256 and all(len(char) == 1 for char in key):
+                table = ''.join(
+                    key[index % len(key)] for index in xrange(256))
+            rejected = ''.join(chr(index) for index in xrange(usable, 256))
+            _translation_tables[key] = (table, rejected)
+        return _translation_tables[key]
+
+
+def _get_random_indices(pool_size, count):
+    """
+    Returns count random indices into a pool, each made from two random
+    bytes, or four for pools of more than 65536 characters.  Values past
+    the largest multiple of pool_size are rejected, so every index is
+    equally likely.
+    """
+    value_format, value_size = ('H', 2) if pool_size <= 65536 else ('I', 4)
+    value_count = 256 ** value_size
+    usable = value_count - value_count % pool_size
+    indices = []
+    while len(indices) < count:
+        needed = count - len(indices)
+        values = unpack(
+            '>{0}{1}'.format(needed, value_format),
+            os.urandom(needed * value_size))
+        indices.extend(value % pool_size for value in values if value < usable)
+    return indices
+
+
+def _translate_random_bytes(size, get_random_bytes, table, rejected):
+    """
+    Returns size bytes from get_random_bytes(count) translated with table,
+    drawing more to make up for the rejected bytes deleted on the way.
+    """
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        # Enough for one draw to do in most cases.
+        count = remaining * 256 // (256 - len(rejected)) + 16
+        chunk = get_random_bytes(count).translate(table, rejected)
+        chunk = chunk[:remaining]
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return ''.join(chunks)
+
+
+class PayloadGenerator(object):
+    """
+    Generates random data made up of characters from a data pool.
+
+    Data is made in blocks of block_size bytes by translating os.urandom
+    output, so generating it costs about as much as copying it, instead of
+    a python call per byte as with ''.join([choice(data_pool) ...]).
+
+    Usage:
+        generator = PayloadGenerator(data_pool)
+        data = generator.generate(1024)
+        for block in generator.iter_blocks(5 * 1024 * 1024 * 1024):
+            ...
+    """
+    def __init__(self, data_pool, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        @param data_pool: characters to use in generating data
+        @type data_pool: list of characters
+        @param block_size: max number of bytes generated at once
+        @type block_size: int
+        """
+        if not data_pool:
+            raise ValueError('data_pool must have at least one character.')
+
+        self.data_pool = list(data_pool)
+        self.block_size = block_size
+        self._table, self._rejected = _get_translation_table(self.data_pool)
+
+    def _generate_block(self, size):
+        pool = self.data_pool
+        pool_size = len(pool)
+        if pool_size > 256:
+            return ''.join([
+                pool[index] for index in _get_random_indices(pool_size, size)])
+
+        random_bytes = _translate_random_bytes(
+            size, os.urandom, self._table, self._rejected)
+        if self._table is not None:
+            return random_bytes
+
+        # Characters longer than a byte can't be translated to, so pick
+        # them one at a time, still avoiding a random call for each.
+        return ''.join([pool[ord(byte) % pool_size] for byte in random_bytes])
+
+    def iter_blocks(self, size):
+        """
+        Yields blocks of at most block_size characters, size characters
+        in total.
+        """
+        remaining = size
+        while remaining > 0:
+            block_size = min(remaining, self.block_size)
+            yield self._generate_block(block_size)
+            remaining -= block_size
+
+    def generate(self, size):
+        """
+        @return: size characters from the data pool
+        @rtype: string
+        """
+        if size <= self.block_size:
+            return self._generate_block(size)
+        return ''.join(self.iter_blocks(size))
+
+
+def generate_payload(size, data_pool):
+    """
+    Shortcut for PayloadGenerator(data_pool).generate(size).
+    """
+    return PayloadGenerator(data_pool).generate(size)
+
+
+# Blocks of a VirtualPayload are windows into a base buffer of this size,
+# see VirtualPayload._get_block_offset.
+VIRTUAL_BASE_SIZE = 262144
+VIRTUAL_BLOCK_SIZE = 65536
+
+# md5 hexdigests of virtual payloads keyed by (seed, size, translation
+# table), so a payload recreated from its seed doesn't have to be hashed
+# again.
+_virtual_payload_md5s = {}
+_virtual_payload_md5s_lock = threading.Lock()
+
+
+def _get_default_data_pool():
+    return [char for char in UNICODE_BLOCKS.get_range(
+        BLOCK_NAMES.basic_latin).encoded_codepoints()]
+
+
+class VirtualPayload(object):
+    """
+    A payload defined by (seed, size, data_pool) instead of by its bytes.
+
+    Any byte range can be regenerated on demand from the seed, so the
+    expected content of a multi-GB object, or of any range of it, can be
+    checked without holding the object in memory.  The payload is
+    file-like, so it can be uploaded as a streamed request body.
+
+    Bytes are taken from a base buffer of VIRTUAL_BASE_SIZE random bytes
+    made from the seed.  Each VIRTUAL_BLOCK_SIZE block of the payload is a
+    window into the base buffer at an offset picked by hashing the seed
+    and the block number, which makes regenerating data about as cheap as
+    copying it.  data_pool may only have single byte characters so that
+    offsets in the payload are offsets in its characters.
+
+    Usage:
+        payload = VirtualPayload('my-seed', 5 * 1024 * 1024 * 1024)
+        client.create_object(container, name, data=payload)
+        ...
+        response = client.get_object(
+            container, name, headers={'Range': 'bytes=100-199'})
+        assert response.content == payload.slice(100, 200)
+    """
+    def __init__(self, seed, size, data_pool=None):
+        """
+        @param seed: value the payload's data is generated from
+        @type seed: string or int
+        @param size: payload size in bytes
+        @type size: int
+        @param data_pool: characters to use in generating the payload.
+                          Defaults to basic latin.
+        @type data_pool: list of characters
+        """
+        self.seed = str(seed)
+        self.size = int(size)
+        self.data_pool = list(data_pool or _get_default_data_pool())
+        self._table, self._rejected = _get_translation_table(self.data_pool)
+        if self._table is None:
+            raise ValueError(
+                'VirtualPayload data_pool may only contain single byte '
+                'characters.')
+
+        self._base = None
+        self._position = 0
+
+    def _get_base(self):
+        if self._base is None:
+            random = Random(self.seed)
+
+            def get_random_bytes(count):
+                return unhexlify('{0:0{1}x}'.format(
+                    random.getrandbits(count * 8), count * 2))
+
+            base = _translate_random_bytes(
+                VIRTUAL_BASE_SIZE, get_random_bytes, self._table,
+                self._rejected)
+            # Repeat the start of the buffer at its end so any block can
+            # be sliced without wrapping around.
+            self._base = base + base[:VIRTUAL_BLOCK_SIZE]
+        return self._base
+
+    def _get_block_offset(self, block_number):
+        digest = md5('{0}:{1}'.format(self.seed, block_number)).digest()
+        return unpack('>I', digest[:4])[0] % VIRTUAL_BASE_SIZE
+
+    def iter_slice(self, start=0, end=None):
+        """
+        Yields the payload's bytes from start up to, but not including,
+        end, at most VIRTUAL_BLOCK_SIZE bytes at a time.  start and end are
+        interpreted like slice indices, so negative values count from the
+        end of the payload.
+        """
+        start, end, _ = slice(start, end).indices(self.size)
+        base = self._get_base()
+        position = start
+        while position < end:
+            block_number, block_position = divmod(
+                position, VIRTUAL_BLOCK_SIZE)
+            length = min(VIRTUAL_BLOCK_SIZE - block_position, end - position)
+            offset = self._get_block_offset(block_number) + block_position
+            yield base[offset:offset + length]
+            position += length
+
+    def slice(self, start=0, end=None):
+        """
+        @return: the payload's bytes from start up to, but not including,
+                 end.  See iter_slice.
+        @rtype: string
+        """
+        return ''.join(self.iter_slice(start, end))
+
+    def matches(self, data, start=0):
+        """
+        @return: True if data is the payload's content starting at start.
+        @rtype: bool
+        """
+        if start < 0 or start + len(data) > self.size:
+            return False
+
+        position = 0
+        for chunk in self.iter_slice(start, start + len(data)):
+            if data[position:position + len(chunk)] != chunk:
+                return False
+            position += len(chunk)
+        return True
+
+    @property
+    def md5(self):
+        """
+        The md5 hexdigest of the whole payload, computed on first use.
+        """
+        key = (self.seed, self.size, self._table)
+        with _virtual_payload_md5s_lock:
+            if key in _virtual_payload_md5s:
+                return _virtual_payload_md5s[key]
+
+        payload_md5 = md5()
+        for chunk in self.iter_slice():
+            payload_md5.update(chunk)
+        hexdigest = payload_md5.hexdigest()
+
+        with _virtual_payload_md5s_lock:
+            _virtual_payload_md5s[key] = hexdigest
+        return hexdigest
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.step not in (None, 1):
+                raise ValueError('VirtualPayload slices must have a step of 1')
+            return self.slice(index.start, index.stop)
+
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError('VirtualPayload index out of range')
+        return self.slice(index, index + 1)
+
+    def __iter__(self):
+        return self.iter_slice()
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            end = self.size
+        else:
+            end = min(self._position + size, self.size)
+        data = self.slice(self._position, end)
+        self._position = max(end, self._position)
+        return data
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self.size
+        self._position = max(offset, 0)
+
+    def tell(self):
+        return self._position
+
+    def __repr__(self):
+        return '<VirtualPayload seed={0!r} size={1}>'.format(
+            self.seed, self.size)
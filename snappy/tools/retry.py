@@ -0,0 +1,240 @@
+import random
+import threading
+from time import sleep, time
+
+DEFAULT_INITIAL_DELAY = 0.1
+DEFAULT_MAX_DELAY = 5
+DEFAULT_BACKOFF = 2.0
+DEFAULT_JITTER = 0.25
+
+
+def _response_ok(response):
+    return response.ok
+
+
+class RetryResult(object):
+    """
+    The outcome of RetryPolicy.run.  elapsed is the time, in seconds, from
+    the first attempt starting to the last one finishing, which is the
+    time to success when succeeded is True.
+    """
+    def __init__(self, response, succeeded, attempts, elapsed, call_site):
+        self.response = response
+        self.succeeded = succeeded
+        self.attempts = attempts
+        self.elapsed = elapsed
+        self.call_site = call_site
+
+    def __repr__(self):
+        return ('<RetryResult call_site={0} succeeded={1} attempts={2} '
+                'elapsed={3:.3f}s>').format(
+            self.call_site, self.succeeded, self.attempts, self.elapsed)
+
+
+class RetryStats(object):
+    """
+    Running totals of RetryPolicy.run calls per call site, e.g. how many
+    attempts a listing took to become consistent and how long it took.
+
+    Usage:
+        for entry in retry_stats.summary():
+            print entry
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _new_stats(self, call_site):
+        return {'call_site': call_site,
+                'calls': 0,
+                'successes': 0,
+                'attempts': 0,
+                'max_attempts': 0,
+                'time_to_success': 0.0,
+                'max_time_to_success': 0.0,
+                'time_to_give_up': 0.0}
+
+    def record(self, result):
+        with self._lock:
+            stats = self._stats.get(result.call_site)
+            if stats is None:
+                stats = self._stats[result.call_site] = self._new_stats(
+                    result.call_site)
+
+            stats['calls'] += 1
+            stats['attempts'] += result.attempts
+            stats['max_attempts'] = max(
+                stats['max_attempts'], result.attempts)
+            if result.succeeded:
+                stats['successes'] += 1
+                stats['time_to_success'] += result.elapsed
+                stats['max_time_to_success'] = max(
+                    stats['max_time_to_success'], result.elapsed)
+            else:
+                stats['time_to_give_up'] += result.elapsed
+
+    def summary(self):
+        """
+        @return: a copy of the totals for each call site, with the mean
+                 attempts and mean time to success added, most total time
+                 first.
+        @rtype: list of dictionaries
+        """
+        with self._lock:
+            entries = [dict(stats) for stats in self._stats.values()]
+
+        for entry in entries:
+            entry['mean_attempts'] = float(entry['attempts']) / entry['calls']
+            entry['mean_time_to_success'] = (
+                entry['time_to_success'] / entry['successes']
+                if entry['successes'] else None)
+        return sorted(
+            entries,
+            key=lambda entry: (
+                entry['time_to_success'] + entry['time_to_give_up']),
+            reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+# Shared by every RetryPolicy that isn't given its own stats.
+retry_stats = RetryStats()
+
+
+class RetryPolicy(object):
+    """
+    How often, and for how long, to retry a call until a success condition
+    is met.
+
+    The first retry comes after initial_delay, and each one after that
+    waits backoff times longer, up to max_delay, so a condition that
+    settles quickly is noticed quickly while one that takes a while isn't
+    polled hard.  Each delay is shortened by a random fraction of up to
+    jitter, so callers retrying together spread out.  Retrying stops at
+    max_attempts or at the deadline, whichever comes first, and there is
+    never a sleep after the last attempt.
+
+    Usage:
+        policy = RetryPolicy(max_attempts=10, timeout=30)
+        result = policy.run(
+            client.get_container_metadata, [container_name],
+            success_func=lambda response: response.status_code == 404)
+        result.succeeded, result.attempts, result.elapsed
+    """
+    def __init__(self, max_attempts=None, initial_delay=DEFAULT_INITIAL_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY, backoff=DEFAULT_BACKOFF,
+                 jitter=DEFAULT_JITTER, timeout=None, deadline=None,
+                 stats=None):
+        """
+        @param max_attempts: the most times to make the call, including
+                             the first.  None for no limit, in which case
+                             timeout or deadline should be set.
+        @type max_attempts: int
+        @param initial_delay: seconds to wait before the first retry.
+        @type initial_delay: float
+        @param max_delay: the longest, in seconds, to wait between attempts.
+        @type max_delay: float
+        @param backoff: how many times longer each delay is than the last.
+        @type backoff: float
+        @param jitter: the largest fraction of a delay that is randomly
+                       taken off it.
+        @type jitter: float
+        @param timeout: seconds after starting to stop retrying.
+        @type timeout: float
+        @param deadline: time, as returned by time.time(), to stop retrying
+                         at.  If timeout is also given, whichever is sooner
+                         is used.
+        @type deadline: float
+        @param stats: where to record the outcome of each run, defaults to
+                      the module's retry_stats.
+        @type stats: RetryStats
+        """
+        if max_attempts is None and timeout is None and deadline is None:
+            raise ValueError(
+                'A RetryPolicy needs max_attempts, timeout or a deadline.')
+
+        self.max_attempts = max_attempts
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.jitter = jitter
+        self.timeout = timeout
+        self.deadline = deadline
+        self.stats = stats if stats is not None else retry_stats
+
+    def iter_delays(self):
+        """
+        Yields the delay before each retry, without a deadline applied.
+        """
+        delay = min(self.initial_delay, self.max_delay)
+        while True:
+            yield delay * (1 - self.jitter * random.random())
+            delay = min(delay * self.backoff, self.max_delay)
+
+    def _get_deadline(self, start):
+        deadline = self.deadline
+        if self.timeout is not None:
+            timeout_deadline = start + self.timeout
+            if deadline is None or timeout_deadline < deadline:
+                deadline = timeout_deadline
+        return deadline
+
+    def run(self, func, func_args=None, func_kwargs=None, success_func=None,
+            call_site=None):
+        """
+        Calls func until success_func returns True for what it returns.
+
+        @param func: the function to call.
+        @type func: function
+        @param func_args: arguments to pass to func.
+        @type func_args: list
+        @param func_kwargs: keyword arguments to pass to func.
+        @type func_kwargs: dictionary
+        @param success_func: takes what func returned and returns True if
+                             it's successful.  Defaults to checking
+                             response.ok.
+        @type success_func: function
+        @param call_site: name to record the outcome under in stats,
+                          defaults to func's name.
+        @type call_site: string
+
+        @return: the last response, whether it succeeded, and how many
+                 attempts and how long it took.
+        @rtype: RetryResult
+        """
+        func_args = func_args or []
+        func_kwargs = func_kwargs or {}
+        if success_func is None:
+            success_func = _response_ok
+        if call_site is None:
+            call_site = getattr(func, '__name__', repr(func))
+
+        start = time()
+        deadline = self._get_deadline(start)
+        delays = self.iter_delays()
+        attempts = 0
+        while True:
+            response = func(*func_args, **func_kwargs)
+            attempts += 1
+            succeeded = success_func(response)
+            if succeeded:
+                break
+            if self.max_attempts is not None and (
+                    attempts >= self.max_attempts):
+                break
+
+            delay = next(delays)
+            if deadline is not None:
+                # Use what is left before the deadline for one last
+                # attempt, rather than stopping short of it.
+                delay = min(delay, deadline - time())
+                if delay <= 0:
+                    break
+            sleep(delay)
+
+        result = RetryResult(
+            response, succeeded, attempts, time() - start, call_site)
+        self.stats.record(result)
+        return result
@@ -0,0 +1,101 @@
+import mmap
+import os
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def get_body_length(data):
+    """
+    Returns the number of bytes that will be sent for a request body, or
+    None if it can't be known without consuming the body (generators and
+    other iterators, which are sent with chunked transfer-encoding).
+
+    Strings and anything else with a length are measured with len().  For
+    mmaps and file objects, which are sent with read(), the length is the
+    bytes left from the current position to the end.
+    """
+    if data is None:
+        return None
+
+    if isinstance(data, mmap.mmap):
+        return max(len(data) - data.tell(), 0)
+
+    if hasattr(data, '__len__'):
+        return len(data)
+
+    if hasattr(data, 'fileno'):
+        try:
+            file_size = os.fstat(data.fileno()).st_size
+        except (AttributeError, IOError, OSError):
+            return None
+        position = data.tell() if hasattr(data, 'tell') else 0
+        return max(file_size - position, 0)
+
+    return None
+
+
+def is_chunk_iterator(data):
+    """
+    Returns True if data is an iterator of chunks, such as a generator,
+    rather than a string or a file-like object.
+    """
+    return (hasattr(data, '__iter__') and
+            not isinstance(
+                data, (basestring, bytearray, list, tuple, dict)) and
+            not hasattr(data, 'read'))
+
+
+class IterableBody(object):
+    """
+    File-like wrapper around an iterator of chunks whose total length is
+    known up front.
+
+    requests sends iterators with chunked transfer-encoding because it can't
+    tell their length.  Wrapping one in an IterableBody gives it a length
+    and a read() method, so it is sent as a regular streamed body with a
+    Content-Length header, one chunk in memory at a time.
+    """
+    def __init__(self, iterable, length):
+        self._iterator = iter(iterable)
+        self._buffer = ''
+        self._offset = 0
+        self.length = int(length)
+        self.bytes_read = 0
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(DEFAULT_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            chunks = [self._buffer[self._offset:]]
+            chunks.extend(self._iterator)
+            data = ''.join(chunks)
+            self._buffer = ''
+            self._offset = 0
+        else:
+            chunks = []
+            remaining = size
+            while remaining > 0:
+                if self._offset >= len(self._buffer):
+                    try:
+                        self._buffer = next(self._iterator)
+                    except StopIteration:
+                        self._buffer = ''
+                        self._offset = 0
+                        break
+                    self._offset = 0
+                chunk = self._buffer[self._offset:self._offset + remaining]
+                self._offset += len(chunk)
+                remaining -= len(chunk)
+                chunks.append(chunk)
+            data = ''.join(chunks)
+
+        self.bytes_read += len(data)
+        return data
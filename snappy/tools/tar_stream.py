@@ -0,0 +1,159 @@
+import bz2
+import tarfile
+import zlib
+from time import time
+
+from snappy.tools.streaming import DEFAULT_CHUNK_SIZE, get_body_length
+
+SUPPORTED_COMPRESSION = [None, 'gz', 'bz2']
+
+# Tells zlib to write, or expect, a gzip header and trailer around the
+# deflate stream.
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+class _NullCompressor(object):
+    def compress(self, data):
+        return data
+
+    def flush(self):
+        return ''
+
+
+def _get_compressor(compression_type):
+    if compression_type not in SUPPORTED_COMPRESSION:
+        raise NameError(
+            "supported compression: {0}".format(SUPPORTED_COMPRESSION))
+
+    if compression_type == 'gz':
+        return zlib.compressobj(9, zlib.DEFLATED, GZIP_WBITS)
+    if compression_type == 'bz2':
+        return bz2.BZ2Compressor(9)
+    return _NullCompressor()
+
+
+def get_extract_archive_param(compression_type):
+    """
+    Returns the extract-archive query parameter value for an archive made
+    with compression_type, e.g. 'tar.gz' for 'gz'.
+    """
+    if not compression_type:
+        return 'tar'
+    return 'tar.{0}'.format(compression_type)
+
+
+def _iter_member_data(data, size, chunk_size):
+    """
+    Yields the data of a member in chunks, checking that it is the size
+    written to the member's header.
+    """
+    if isinstance(data, basestring):
+        chunks = [data]
+    elif hasattr(data, 'read'):
+        chunks = iter(lambda: data.read(chunk_size), '')
+    elif hasattr(data, '__iter__'):
+        chunks = data
+    else:
+        raise TypeError(
+            'unsupported archive member data: {0!r}'.format(data))
+
+    written = 0
+    for chunk in chunks:
+        written += len(chunk)
+        if written > size:
+            raise ValueError(
+                'archive member data is longer than its size, {0}'.format(
+                    size))
+        yield chunk
+
+    if written != size:
+        raise ValueError(
+            'archive member data is {0} bytes, expected {1}'.format(
+                written, size))
+
+
+def _iter_tar_blocks(members, mtime, chunk_size):
+    """
+    Yields the uncompressed tar stream for members.
+    """
+    for member in members:
+        if len(member) == 2:
+            name, data = member
+            size = get_body_length(data)
+        else:
+            name, data, size = member
+
+        if size is None:
+            raise ValueError(
+                'the size of archive member {0} has to be given since it '
+                'can not be determined from its data'.format(name))
+
+        info = tarfile.TarInfo(name=name)
+        info.size = size
+        info.mtime = mtime
+        yield info.tobuf(format=tarfile.GNU_FORMAT)
+
+        for chunk in _iter_member_data(data, size, chunk_size):
+            yield chunk
+
+        remainder = size % tarfile.BLOCKSIZE
+        if remainder:
+            yield tarfile.NUL * (tarfile.BLOCKSIZE - remainder)
+
+    # The end of archive marker is two empty blocks, and the archive is
+    # padded to a multiple of the record size like tarfile does.
+    yield tarfile.NUL * (tarfile.BLOCKSIZE * 2)
+
+
+def iter_tar_archive(members, compression_type=None,
+                     chunk_size=DEFAULT_CHUNK_SIZE, mtime=None):
+    """
+    Generates a tar archive, optionally compressed, a chunk at a time.
+
+    Members are only read as the archive is consumed, so the archive can be
+    sent as a chunked request body, e.g. with create_archive_object,
+    without being written to disk or held in memory.
+
+    @param members: the members to archive.  Each one is either a
+                    (name, data) or a (name, data, size) tuple.  data may be
+                    a string, a file like object, a VirtualPayload or an
+                    iterator of chunks.  The size has to be given for
+                    iterators.
+    @type members: iterable
+    @param compression_type: None, 'gz' or 'bz2'
+    @type compression_type: string
+    @param chunk_size: number of bytes to try to yield at a time
+    @type chunk_size: int
+    @param mtime: modification time of every member.  Defaults to now.
+    @type mtime: int
+
+    @return: a generator of archive chunks
+    @rtype: generator
+    """
+    compressor = _get_compressor(compression_type)
+    if mtime is None:
+        mtime = int(time())
+
+    buffered = []
+    buffered_size = 0
+    archive_size = 0
+    for block in _iter_tar_blocks(members, mtime, chunk_size):
+        archive_size += len(block)
+        compressed = compressor.compress(block)
+        if compressed:
+            buffered.append(compressed)
+            buffered_size += len(compressed)
+        if buffered_size >= chunk_size:
+            yield ''.join(buffered)
+            buffered = []
+            buffered_size = 0
+
+    remainder = archive_size % tarfile.RECORDSIZE
+    if remainder:
+        padding = tarfile.NUL * (tarfile.RECORDSIZE - remainder)
+        buffered.append(compressor.compress(padding))
+    buffered.append(compressor.flush())
+
+    data = ''.join(buffered)
+    if data:
+        yield data
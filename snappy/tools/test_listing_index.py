@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import random
+import unittest
+
+from snappy.tools.listing_index import ListingIndex
+
+NAME_CHARACTERS = [u'a', u'b', u'0', u'/', u'-', u'\xe9']
+
+
+def swift_listing(names, prefix='', delimiter='', marker='', end_marker='',
+                  limit=10000):
+    """
+    A port of the loop swift's container broker lists objects with, run
+    over a sorted list instead of a database, to check ListingIndex
+    against.
+    """
+    names = sorted(name.encode('utf-8') for name in names)
+    prefix, delimiter, marker, end_marker = [
+        value.encode('utf-8')
+        for value in (prefix, delimiter, marker, end_marker)]
+    original_marker = marker
+    # Set after a subdir, when the marker is the first name past it and
+    # may itself be listed.
+    marker_included = False
+    results = []
+    while len(results) < limit:
+        rows = [
+            name for name in names
+            if (not marker or name > marker or
+                (marker_included and name == marker)) and
+            (not end_marker or name < end_marker) and
+            name.startswith(prefix)][:limit - len(results)]
+        if not rows:
+            break
+
+        for name in rows:
+            marker = name
+            marker_included = False
+            if delimiter:
+                end = name.find(delimiter, len(prefix))
+                if end >= 0:
+                    subdir = name[:end + len(delimiter)]
+                    marker = name[:end] + chr(ord(delimiter) + 1)
+                    marker_included = True
+                    if subdir != original_marker:
+                        results.append(subdir)
+                    break
+            results.append(name)
+            if len(results) >= limit:
+                break
+    return [result.decode('utf-8') for result in results]
+
+
+class ListingIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.random = random.Random(1)
+        self.names = set()
+        while len(self.names) < 200:
+            self.names.add(self._random_string(1, 6))
+        self.index = ListingIndex(self.names)
+
+    def _random_string(self, min_length, max_length):
+        return u''.join(
+            self.random.choice(NAME_CHARACTERS)
+            for _ in xrange(self.random.randint(min_length, max_length)))
+
+    def test_query_matches_swift(self):
+        for _ in xrange(500):
+            query = {
+                'prefix': self._random_string(0, 3),
+                'delimiter': self.random.choice([u'', u'/', u'-', u'b']),
+                'marker': self._random_string(0, 3),
+                'end_marker': self._random_string(0, 3),
+                'limit': self.random.randint(1, 50)}
+            self.assertEqual(
+                swift_listing(self.names, **query), self.index.query(**query),
+                msg='query {0!r}'.format(query))
+
+    def test_query_params(self):
+        params = {'prefix': u'a', 'delimiter': u'/', 'limit': '5',
+                  'format': 'json'}
+        self.assertEqual(
+            swift_listing(self.names, prefix=u'a', delimiter=u'/', limit=5),
+            self.index.query_params(params))
+
+    def test_add_and_discard(self):
+        self.index.add(u'new\xe9'.encode('utf-8'), record='record')
+        self.assertIn(u'new\xe9', self.index)
+        self.assertEqual(self.index.get(u'new\xe9'), 'record')
+        self.assertEqual(len(self.index), len(self.names) + 1)
+
+        self.index.discard(u'new\xe9')
+        self.assertNotIn(u'new\xe9', self.index)
+        self.assertIsNone(self.index.get(u'new\xe9'))
+        self.assertEqual(list(self.index), sorted(
+            self.names, key=lambda name: name.encode('utf-8')))
@@ -0,0 +1,39 @@
+import unittest
+from collections import Counter
+
+from snappy.tools.payload import PayloadGenerator, VirtualPayload
+
+PRINTABLE_POOL = [chr(index) for index in xrange(32, 127)]
+
+
+class PayloadGeneratorTest(unittest.TestCase):
+    def assert_uniform(self, counts, pool_size, total):
+        expected = float(total) / pool_size
+        self.assertEqual(len(counts), pool_size)
+        for char, count in counts.items():
+            self.assertAlmostEqual(
+                count / expected, 1, delta=0.15,
+                msg='{0!r} was picked {1} times, expected about '
+                    '{2:.0f}'.format(char, count, expected))
+
+    def test_byte_pool_is_uniform(self):
+        # 256 isn't a multiple of 95, so picking with value % 95 would
+        # favour the first 66 characters.
+        data = PayloadGenerator(PRINTABLE_POOL).generate(950000)
+        self.assertEqual(len(data), 950000)
+        self.assert_uniform(Counter(data), len(PRINTABLE_POOL), len(data))
+
+    def test_large_pool_is_uniform(self):
+        pool = [unichr(0x4e00 + index).encode('utf-8')
+                for index in xrange(300)]
+        data = PayloadGenerator(pool).generate(300000)
+        chars = [data[index:index + 3] for index in xrange(0, len(data), 3)]
+        self.assertEqual(len(chars), 300000)
+        self.assert_uniform(Counter(chars), len(pool), len(chars))
+
+    def test_virtual_payload_is_reproducible(self):
+        payload = VirtualPayload('seed', 100000, data_pool=PRINTABLE_POOL)
+        same_payload = VirtualPayload(
+            'seed', 100000, data_pool=PRINTABLE_POOL)
+        self.assertEqual(payload.slice(), same_payload.slice())
+        self.assertLessEqual(set(payload.slice()), set(PRINTABLE_POOL))
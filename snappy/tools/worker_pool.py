@@ -0,0 +1,160 @@
+import sys
+import threading
+from Queue import Queue
+
+# Placed on the task queue to tell a worker thread to exit.
+_STOP = object()
+
+
+class TaskResult(object):
+    """
+    The outcome of a single task run by a WorkerPool.  Exactly one of
+    result or error is set once the task has finished.
+    """
+    def __init__(self, item=None):
+        self.item = item
+        self.result = None
+        self.error = None
+        self.exc_info = None
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def ok(self):
+        return self.done and self.error is None
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+        return self
+
+    def get(self, timeout=None):
+        """
+        Waits for the task to finish and returns its result, re-raising the
+        task's exception if it failed.
+        """
+        self.wait(timeout)
+        if self.exc_info is not None:
+            raise self.exc_info[0], self.exc_info[1], self.exc_info[2]
+        return self.result
+
+    def _set_result(self, result):
+        self.result = result
+        self._done.set()
+
+    def _set_error(self, exc_info):
+        self.exc_info = exc_info
+        self.error = exc_info[1]
+        self._done.set()
+
+    def __repr__(self):
+        return '<TaskResult item={0} ok={1}>'.format(self.item, self.ok)
+
+
+class WorkerPool(object):
+    """
+    A fixed number of worker threads pulling tasks from a bounded queue.
+
+    submit() blocks once the queue is full, so a caller producing tasks
+    (and the data they carry) can never get more than twice the pool size
+    ahead of the workers.
+
+    Usage:
+        with WorkerPool(10) as pool:
+            results = pool.map(client.delete_object, names)
+    """
+    def __init__(self, size):
+        self.size = max(int(size), 1)
+        self._tasks = Queue(maxsize=self.size)
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            while len(self._threads) < self.size:
+                thread = threading.Thread(target=self._work)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            task = self._tasks.get()
+            if task is _STOP:
+                return
+            task_result, func, args, kwargs = task
+            try:
+                task_result._set_result(func(*args, **kwargs))
+            except Exception:
+                task_result._set_error(sys.exc_info())
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Schedules func(*args, **kwargs) to run on a worker thread.
+
+        @return: a TaskResult that is completed when the call finishes.
+        @rtype: TaskResult
+        """
+        self._start()
+        task_result = TaskResult(item=args)
+        self._tasks.put((task_result, func, args, kwargs))
+        return task_result
+
+    def map(self, func, items, unpack=False):
+        """
+        Calls func on every item and waits for all of the calls to finish.
+
+        @param func: the function to call.
+        @type func: function
+        @param items: the arguments for each call.
+        @type items: iterable
+        @param unpack: if True, each item is a tuple of positional
+                       arguments, otherwise it is passed as the only one.
+        @type unpack: bool
+
+        @return: one TaskResult per item, in the same order as items.
+        @rtype: list
+        """
+        task_results = []
+        for item in items:
+            if unpack:
+                task_result = self.submit(func, *item)
+            else:
+                task_result = self.submit(func, item)
+            task_result.item = item
+            task_results.append(task_result)
+
+        for task_result in task_results:
+            task_result.wait()
+        return task_results
+
+    def close(self):
+        """
+        Lets the workers finish queued tasks, then stops them.
+        """
+        with self._lock:
+            threads = self._threads
+            self._threads = []
+        for _ in threads:
+            self._tasks.put(_STOP)
+        for thread in threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def run_concurrently(func, items, concurrency, unpack=False):
+    """
+    Calls func on every item using at most concurrency threads.
+
+    @return: one TaskResult per item, in the same order as items.
+    @rtype: list
+    """
+    with WorkerPool(concurrency) as pool:
+        return pool.map(func, items, unpack=unpack)